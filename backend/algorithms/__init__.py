@@ -23,6 +23,7 @@ from .emotion import (
     get_emotion_from_content,
     sentiment_from_valence,
     simulate_mood_change,
+    simulate_mood_change_batch,
 )
 
 __all__ = [
@@ -46,4 +47,5 @@ __all__ = [
     "get_emotion_from_content",
     "sentiment_from_valence",
     "simulate_mood_change",
+    "simulate_mood_change_batch",
 ]
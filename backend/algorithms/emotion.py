@@ -9,6 +9,14 @@ from typing import Optional
 from dataclasses import dataclass
 from collections import defaultdict
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 
 @dataclass
 class EmotionScore:
@@ -538,3 +546,65 @@ def simulate_mood_change(
 
     # 限制在有效范围内
     return max(-1.0, min(1.0, new_mood))
+
+
+def _mood_change_batch_numpy(
+    current_moods: np.ndarray,
+    stimuli: np.ndarray,
+    openness: np.ndarray,
+    neuroticism: np.ndarray,
+) -> np.ndarray:
+    """``simulate_mood_change`` 的 NumPy 向量化实现。"""
+    change = np.where(
+        stimuli < 0.0,
+        -np.abs(stimuli) * (1.0 + neuroticism * 0.5),
+        stimuli,
+    )
+    change = change * (0.3 + openness * 0.4)
+    new_moods = current_moods * 0.9 + change * 0.1
+    return np.clip(new_moods, -1.0, 1.0)
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mood_change_batch_numba(current_moods, stimuli, openness, neuroticism):  # pragma: no cover
+        n = current_moods.shape[0]
+        out = np.empty(n, dtype=np.float64)
+        for i in prange(n):
+            stimulus = stimuli[i]
+            if stimulus < 0.0:
+                change = -abs(stimulus) * (1.0 + neuroticism[i] * 0.5)
+            else:
+                change = stimulus
+            change *= 0.3 + openness[i] * 0.4
+            mood = current_moods[i] * 0.9 + change * 0.1
+            out[i] = min(1.0, max(-1.0, mood))
+        return out
+
+    # 导入时用微型输入预热 JIT 缓存，首个 tick 不吃编译延迟
+    try:
+        _mood_change_batch_numba(
+            np.zeros(2), np.zeros(2), np.full(2, 0.5), np.full(2, 0.5))
+    except Exception:
+        pass
+
+
+def simulate_mood_change_batch(
+    current_moods: np.ndarray,
+    stimuli: np.ndarray,
+    openness: np.ndarray,
+    neuroticism: np.ndarray,
+) -> np.ndarray:
+    """对整批代理模拟情绪变化（SoA 数组按位置对齐）。
+
+    与 ``simulate_mood_change`` 使用相同公式；安装了 Numba 时走
+    并行 JIT 内核，否则回退到 NumPy 向量化实现。
+    """
+    current_moods = np.asarray(current_moods, dtype=np.float64)
+    stimuli = np.asarray(stimuli, dtype=np.float64)
+    openness = np.asarray(openness, dtype=np.float64)
+    neuroticism = np.asarray(neuroticism, dtype=np.float64)
+
+    if HAS_NUMBA:
+        return _mood_change_batch_numba(current_moods, stimuli, openness, neuroticism)
+    return _mood_change_batch_numpy(current_moods, stimuli, openness, neuroticism)
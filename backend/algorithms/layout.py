@@ -26,6 +26,129 @@ try:
 except ImportError:
     HAS_NETWORKX = False
 
+from . import layout_kernels
+
+# 超过该节点数时 NumPy 的 (n, n, 2) 差值张量开始受内存带宽限制，
+# 若安装了 Numba 则切换到分块 JIT 内核
+_NUMBA_NODE_THRESHOLD = 2000
+
+# 超过该节点数时全对排斥力改用 Barnes-Hut 四叉树近似（O(n log n)）。
+# theta 为开角阈值：节点尺寸/距离小于 theta 时用簇的质心汇总远场排斥。
+_BARNES_HUT_THRESHOLD = 1000
+_BARNES_HUT_THETA = 0.9
+_BARNES_HUT_MAX_DEPTH = 32
+
+
+class _QuadNode:
+    """Barnes-Hut 四叉树节点：累积质量与质心，叶子保存点索引。"""
+
+    __slots__ = ("cx", "cy", "half", "mass", "sum_x", "sum_y", "points", "children", "depth")
+
+    def __init__(self, cx: float, cy: float, half: float, depth: int = 0):
+        self.cx = cx
+        self.cy = cy
+        self.half = half
+        self.depth = depth
+        self.mass = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.points: list[int] | None = []  # 内部节点为 None
+        self.children: list["_QuadNode"] | None = None
+
+    def insert(self, idx: int, x: float, y: float, positions: Any) -> None:
+        self.mass += 1
+        self.sum_x += x
+        self.sum_y += y
+
+        if self.children is None:
+            self.points.append(idx)
+            # 叶子超员且未到最大深度时再细分；重合点在最大深度聚在同一叶子
+            if len(self.points) > 1 and self.depth < _BARNES_HUT_MAX_DEPTH:
+                self._subdivide(positions)
+        else:
+            self._child_for(x, y).insert(idx, x, y, positions)
+
+    def _subdivide(self, positions: Any) -> None:
+        quarter = self.half / 2
+        depth = self.depth + 1
+        self.children = [
+            _QuadNode(self.cx - quarter, self.cy - quarter, quarter, depth),
+            _QuadNode(self.cx + quarter, self.cy - quarter, quarter, depth),
+            _QuadNode(self.cx - quarter, self.cy + quarter, quarter, depth),
+            _QuadNode(self.cx + quarter, self.cy + quarter, quarter, depth),
+        ]
+        points, self.points = self.points, None
+        for idx in points:
+            x = float(positions[idx, 0])
+            y = float(positions[idx, 1])
+            self._child_for(x, y).insert(idx, x, y, positions)
+
+    def _child_for(self, x: float, y: float) -> "_QuadNode":
+        index = (1 if x >= self.cx else 0) + (2 if y >= self.cy else 0)
+        return self.children[index]
+
+
+def _barnes_hut_repulsion(pos: Any, repulsion: float, theta: float = _BARNES_HUT_THETA) -> Any:
+    """用 Barnes-Hut 四叉树近似计算全对排斥位移。
+
+    远处的点簇以质心和总质量汇总（开角判据 size/dist < theta），
+    近处的叶子仍做精确的成对计算，复杂度从 O(n²) 降到 O(n log n)。
+    """
+    n = pos.shape[0]
+    disp = np.zeros_like(pos)
+    if n < 2:
+        return disp
+
+    min_xy = pos.min(axis=0)
+    max_xy = pos.max(axis=0)
+    half = float(max(max_xy[0] - min_xy[0], max_xy[1] - min_xy[1])) / 2 + 1.0
+    root = _QuadNode(float(min_xy[0]) + half, float(min_xy[1]) + half, half)
+
+    for i in range(n):
+        root.insert(i, float(pos[i, 0]), float(pos[i, 1]), pos)
+
+    theta_sq = theta * theta
+    for i in range(n):
+        xi = float(pos[i, 0])
+        yi = float(pos[i, 1])
+        acc_x = 0.0
+        acc_y = 0.0
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.mass == 0:
+                continue
+            dx = xi - node.sum_x / node.mass
+            dy = yi - node.sum_y / node.mass
+            dist_sq = dx * dx + dy * dy
+
+            if node.children is not None:
+                # 开角判据：(2*half)² < theta² * dist² 时整簇按质心汇总
+                size = node.half * 2
+                if size * size < theta_sq * dist_sq:
+                    dist_sq = max(dist_sq, 1e-6)
+                    dist = math.sqrt(dist_sq) + 0.001
+                    force = repulsion * node.mass / dist_sq
+                    acc_x += (dx / dist) * force
+                    acc_y += (dy / dist) * force
+                else:
+                    stack.extend(node.children)
+            else:
+                for j in node.points:
+                    if j == i:
+                        continue
+                    pdx = xi - float(pos[j, 0])
+                    pdy = yi - float(pos[j, 1])
+                    p_sq = max(pdx * pdx + pdy * pdy, 1e-6)
+                    p_dist = math.sqrt(p_sq) + 0.001
+                    force = repulsion / p_sq
+                    acc_x += (pdx / p_dist) * force
+                    acc_y += (pdy / p_dist) * force
+        disp[i, 0] = acc_x
+        disp[i, 1] = acc_y
+
+    return disp
+
 
 @dataclass
 class Point2D:
@@ -146,103 +269,92 @@ class ForceDirectedLayout:
 
         fixed_indices = {node_index[node] for node in (fixed_nodes or []) if node in node_index}
 
+        # 向量化状态：位置为 (n, 2) 数组，边为索引/权重数组。
+        pos = np.array([(p.x, p.y) for p in positions], dtype=np.float64)
+        if edges:
+            edge_i = np.array([node_index[s] for s, t in edges], dtype=np.intp)
+            edge_j = np.array([node_index[t] for s, t in edges], dtype=np.intp)
+            edge_w = np.array(weights, dtype=np.float64) if weights else np.ones(len(edges))
+        else:
+            edge_i = edge_j = np.zeros(0, dtype=np.intp)
+            edge_w = np.zeros(0)
+
+        movable = np.ones(num_nodes, dtype=bool)
+        for i in fixed_indices:
+            movable[i] = False
+
+        center = np.array([self.width / 2, self.height / 2])
+
         # 主循环
         temperature = self.initial_temperature
         energy = float('inf')
+        use_kernel = layout_kernels.HAS_NUMBA and num_nodes > _NUMBA_NODE_THRESHOLD
+        kernel_disp = np.empty_like(pos) if use_kernel else None
 
         for iteration in range(self.iterations):
-            old_positions = [Point2D(p.x, p.y) for p in positions]
-
-            # 计算力
-            displacements = [Point2D(0.0, 0.0) for _ in range(num_nodes)]
-
-            # Repulsion (all pairs)
-            for i in range(num_nodes):
-                for j in range(i + 1, num_nodes):
-                    dx = positions[i].x - positions[j].x
-                    dy = positions[i].y - positions[j].y
-                    dist_sq = dx * dx + dy * dy
-                    dist = math.sqrt(dist_sq) + 0.001  # 避免除以零
-
-                    # 排斥力
-                    force = self.repulsion_constant / dist_sq
-                    fx = (dx / dist) * force
-                    fy = (dy / dist) * force
-
-                    displacements[i].x += fx
-                    displacements[i].y += fy
-                    displacements[j].x -= fx
-                    displacements[j].y -= fy
-
-            # Attraction (connected nodes)
-            for source, targets in adjacency.items():
-                i = node_index[source]
-                for target in targets:
-                    j = node_index[target]
-                    if i >= j:
-                        continue  # 每条边只处理一次
-
-                    weight = edge_weights.get((source, target), 1.0)
-                    dx = positions[i].x - positions[j].x
-                    dy = positions[i].y - positions[j].y
-                    dist = math.sqrt(dx * dx + dy * dy) + 0.001
-
-                    # 吸引力（弹簧）
-                    force = self.attraction_constant * dist * math.log(dist + 1) * weight
-                    fx = (dx / dist) * force
-                    fy = (dy / dist) * force
-
-                    displacements[i].x -= fx
-                    displacements[i].y -= fy
-                    displacements[j].x += fx
-                    displacements[j].y += fy
-
-            # Gravity (pull towards center)
-            center_x = self.width / 2
-            center_y = self.height / 2
-            for i in range(num_nodes):
-                dx = center_x - positions[i].x
-                dy = center_y - positions[i].y
-                dist = math.sqrt(dx * dx + dy * dy) + 0.001
-
-                force = self.gravity_constant * dist
-                displacements[i].x += (dx / dist) * force
-                displacements[i].y += (dy / dist) * force
+            if use_kernel:
+                energy = float(layout_kernels.fd_step(
+                    pos, kernel_disp, edge_i, edge_j, edge_w, movable,
+                    self.repulsion_constant, self.attraction_constant,
+                    self.gravity_constant, self.width, self.height, temperature,
+                ))
+                temperature *= self.cooling_factor
+                if energy < 0.1 or temperature < 0.01:
+                    break
+                continue
+
+            old_pos = pos.copy()
+
+            if num_nodes > _BARNES_HUT_THRESHOLD:
+                # Repulsion (Barnes-Hut, O(n log n))
+                displacements = _barnes_hut_repulsion(pos, self.repulsion_constant)
+            else:
+                # Repulsion (all pairs, broadcasting)
+                diff = pos[:, None, :] - pos[None, :, :]  # (n, n, 2)
+                dist_sq = np.einsum("ijk,ijk->ij", diff, diff)
+                np.fill_diagonal(dist_sq, 1.0)
+                dist_sq = np.maximum(dist_sq, 1e-6)
+                dist = np.sqrt(dist_sq) + 0.001  # 避免除以零
+
+                force = self.repulsion_constant / dist_sq
+                np.fill_diagonal(force, 0.0)
+                displacements = np.einsum("ij,ijk->ik", force / dist, diff)
+
+            # Attraction (connected nodes, per-edge arrays)
+            if len(edge_i):
+                evec = pos[edge_i] - pos[edge_j]
+                edist = np.sqrt(np.einsum("ij,ij->i", evec, evec)) + 0.001
+                eforce = self.attraction_constant * edist * np.log(edist + 1) * edge_w
+                pull = evec * (eforce / edist)[:, None]
+                np.subtract.at(displacements, edge_i, pull)
+                np.add.at(displacements, edge_j, pull)
+
+            # Gravity (pull towards center)：(d/|d|) * g * |d| 化简为 d * g
+            displacements += (center - pos) * self.gravity_constant
 
             # Apply displacements with temperature limiting
-            max_displacement = temperature
-            for i in range(num_nodes):
-                if i in fixed_indices:
-                    continue
+            dnorm = np.sqrt(np.einsum("ij,ij->i", displacements, displacements))
+            scale = np.where(dnorm > temperature, temperature / np.maximum(dnorm, 1e-12), 1.0)
+            displacements *= scale[:, None]
+            displacements[~movable] = 0.0
 
-                dist = math.sqrt(displacements[i].x ** 2 + displacements[i].y ** 2)
-                if dist > max_displacement:
-                    scale = max_displacement / dist
-                    displacements[i].x *= scale
-                    displacements[i].y *= scale
-
-                positions[i].x += displacements[i].x
-                positions[i].y += displacements[i].y
-
-                # Keep within bounds
-                positions[i].x = max(0, min(self.width, positions[i].x))
-                positions[i].y = max(0, min(self.height, positions[i].y))
+            pos += displacements
+            np.clip(pos[:, 0], 0.0, self.width, out=pos[:, 0])
+            np.clip(pos[:, 1], 0.0, self.height, out=pos[:, 1])
 
             # Cool down
             temperature *= self.cooling_factor
 
             # Check convergence
-            energy = sum(
-                old_positions[i].distance_to(positions[i])
-                for i in range(num_nodes)
-            )
+            moved = pos - old_pos
+            energy = float(np.sqrt(np.einsum("ij,ij->i", moved, moved)).sum())
 
             if energy < 0.1 or temperature < 0.01:
                 break
 
         # Build result
         result_positions = {
-            node: positions[i]
+            node: Point2D(float(pos[i, 0]), float(pos[i, 1]))
             for node, i in node_index.items()
         }
 
@@ -505,6 +617,13 @@ def layout_with_networkx(
     )
 
 
+# 布局结果缓存：键为（代理集合、边集合、算法、画布尺寸）。
+# 输入不变时布局无需重算，同时也让随机初始化的力导向布局
+# 在请求之间保持稳定。
+_LAYOUT_CACHE_MAX = 8
+_layout_cache: dict[tuple, dict[int, tuple[float, float]]] = {}
+
+
 def compute_agent_layout(
     agent_ids: list[int],
     follow_edges: list[tuple[int, int]] | None = None,
@@ -530,6 +649,17 @@ def compute_agent_layout(
     if not agent_ids:
         return {}
 
+    cache_key = (
+        tuple(agent_ids),
+        tuple(follow_edges) if follow_edges else (),
+        algorithm,
+        width,
+        height,
+    )
+    cached = _layout_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+
     # Default edges (empty if not provided)
     edges = follow_edges or []
 
@@ -565,4 +695,8 @@ def compute_agent_layout(
         if aid not in positions:
             positions[aid] = (random.random() * width, random.random() * height)
 
+    if len(_layout_cache) >= _LAYOUT_CACHE_MAX:
+        _layout_cache.pop(next(iter(_layout_cache)))
+    _layout_cache[cache_key] = dict(positions)
+
     return positions
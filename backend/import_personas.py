@@ -33,7 +33,7 @@ from models.types import (
 )
 from models.database import (
     init_db,
-    save_agent_profile,
+    save_agent_profiles,
     get_db_path,
 )
 from algorithms.emotion import get_emotion_from_content
@@ -243,22 +243,19 @@ def import_personas(
     if clear_existing:
         print("Warning: Clearing existing agents (not yet implemented)")
 
-    # 导入每个 persona
-    imported_count = 0
+    # 先全部转换，再一个事务批量写入（逐条保存是 N×8 次独立提交）
+    profiles = []
     for agent_id, (user_key, persona_data) in enumerate(personas.items(), start=1):
         try:
-            agent_profile = convert_persona_to_agent(user_key, persona_data, agent_id)
-            save_agent_profile(agent_profile)
-            imported_count += 1
-
-            if imported_count % 10 == 0:
-                print(f"  Imported {imported_count}/{total_personas} agents...")
-
+            profiles.append(convert_persona_to_agent(user_key, persona_data, agent_id))
         except Exception as e:
             print(f"  Error importing {user_key}: {e}")
             import traceback
             traceback.print_exc()
 
+    save_agent_profiles(profiles)
+    imported_count = len(profiles)
+
     print(f"Import complete! {imported_count}/{total_personas} agents imported.")
     return imported_count
 
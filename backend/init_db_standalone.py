@@ -249,6 +249,36 @@ def create_extended_tables(cursor: sqlite3.Cursor) -> None:
         )
     """)
 
+    # 信息流排序索引：/api/feed 的 ORDER BY 下推到 SQL 后，
+    # likes/emotion 排序走索引扫描而不是全表排序
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_post_num_likes
+        ON post(num_likes DESC)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_post_emotion_abs
+        ON post_emotion(ABS(emotion) DESC)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_post_tick_tick
+        ON post_tick(tick DESC)
+    """)
+    # 日志级别过滤 + 时间排序走同一个复合索引
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_log_level_tick
+        ON simulation_log(level, tick DESC)
+    """)
+    # 热点外键/排序列的覆盖索引：user_* 扩展表的 user_id 都是
+    # PRIMARY KEY 已自带索引；这里补上仍走全表扫描的几处——
+    # 议题立场按 user_id 批量取、post 按作者/时间取、时间线按 tick 倒序
+    for stmt in (
+        "CREATE INDEX IF NOT EXISTS idx_issue_stance_user ON user_issue_stance(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_post_user ON post(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_post_created_at ON post(created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_timeline_tick ON timeline_event(tick DESC)",
+    ):
+        cursor.execute(stmt)
+
     # OASIS post sync tracking
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS oasis_post_sync (
@@ -259,6 +289,11 @@ def create_extended_tables(cursor: sqlite3.Cursor) -> None:
         )
     """)
 
+    # agents_json 列的一次性迁移（老库建表时没有该列）
+    cursor.execute("PRAGMA table_info(simulation_state)")
+    if "agents_json" not in {r[1] for r in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE simulation_state ADD COLUMN agents_json TEXT")
+
 
 def init_db_standalone() -> None:
     """Initialize the database without requiring OASIS."""
@@ -266,6 +301,13 @@ def init_db_standalone() -> None:
 
     # Connect and create tables
     conn = sqlite3.connect(db_path)
+    # 建库即设定持久化的日志模式与页大小：WAL/page_size 随数据库文件
+    # 持久保存，page_size 必须在任何建表之前设定才对新库生效；
+    # 每连接级 pragma（cache_size 等）由运行期的 _configure_sqlite 负责
+    conn.execute("PRAGMA page_size=8192;")
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA wal_autocheckpoint=1000;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
     cursor = conn.cursor()
 
     try:
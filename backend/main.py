@@ -4,8 +4,11 @@ OASIS 前端集成后端 - 主 FastAPI 应用程序
 此后端服务提供 REST API 和 WebSocket 端点
 以将 OASIS 仿真平台与前端演示集成。
 """
-import uuid
 import time
+import itertools
+import threading
+import hashlib
+import base64
 import asyncio
 import re
 import math
@@ -17,35 +20,50 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Body
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Body, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
+import numpy as np
 from pydantic import BaseModel, Field, ConfigDict
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from models import (
     init_db,
     get_all_agents,
+    iter_all_agents,
     get_agent_by_id,
     get_agents_by_ids,
     save_agent_profile,
     get_feed_posts,
     save_feed_post,
+    save_feed_posts,
+    save_oasis_feed_post,
+    save_oasis_feed_posts,
     get_simulation_state,
     save_simulation_state,
-    create_snapshot,
+    update_simulation_control,
+    create_snapshot as create_snapshot_record,
     get_all_snapshots,
     get_snapshot_by_id,
+    get_snapshot_raw,
+    snapshot_exists,
     delete_snapshot as delete_snapshot_record,
+    prune_snapshots,
     save_timeline_event,
+    save_timeline_events,
     get_timeline_events,
     save_log_line,
+    save_log_lines,
     get_log_lines,
-    save_intervention,
-    get_all_interventions,
+    save_intervention_with_event,
+    get_interventions,
     save_bookmark,
+    save_bookmark_with_event,
     get_all_bookmarks,
     delete_bookmark,
     get_all_group_profiles,
@@ -67,6 +85,7 @@ from algorithms import (
     compute_agent_layout,
     get_emotion_from_content,
     simulate_mood_change,
+    simulate_mood_change_batch,
     EmotionScore,
 )
 
@@ -131,6 +150,17 @@ logging.root.addHandler(console_handler)
 # Redirect warnings to log file
 logging.captureWarnings(True)
 
+# 应用日志走队列：请求协程只做一次非阻塞入队，
+# 格式化与文件/控制台 I/O 在监听线程完成，异常风暴不会串行化事件循环
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+logger = logging.getLogger("socsim")
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+_log_listener = QueueListener(
+    _log_queue, file_handler, console_handler, respect_handler_level=True
+)
+_log_listener.start()
+
 DEFAULT_LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "deepseek")
 DEFAULT_LLM_MODEL = os.environ.get("LLM_MODEL", "deepseek-chat")
 DEFAULT_LLM_BASE_URL = os.environ.get("LLM_BASE_URL", "https://api.deepseek.com/v1")
@@ -173,12 +203,37 @@ PERSONAS_PATH = str(Path(__file__).resolve().parent / "twitter_personas_20260123
 _system_logs: List[dict] = []
 _max_system_logs = 500
 
+
+# _mkid 的随机字节池：每 256 个 ID 才做一次 os.urandom 系统调用，
+# 而不是像 uuid4() 那样每个 ID 一次。事件循环线程与 to_thread 工作线程
+# 都会生成 ID，池位置用锁保护（无竞争时开销可忽略）。
+_ID_POOL_IDS = 256
+_id_pool: bytes = b""
+_id_pool_pos = 0
+_id_pool_lock = threading.Lock()
+
+
+def _mkid() -> str:
+    """生成紧凑的唯一 ID：16 随机字节的 urlsafe base64（22 字符）。
+
+    与 36 字符的连字符十六进制形式相比小约 40%——时间线/日志负载
+    里 ID 占大头，编码与传输成本按条数累积。随机字节从预取池切片，
+    高 tick 率下每条行为/日志生成 ID 不再各自触发系统调用。
+    """
+    global _id_pool, _id_pool_pos
+    with _id_pool_lock:
+        if _id_pool_pos >= len(_id_pool):
+            _id_pool = os.urandom(16 * _ID_POOL_IDS)
+            _id_pool_pos = 0
+        chunk = _id_pool[_id_pool_pos:_id_pool_pos + 16]
+        _id_pool_pos += 16
+    return base64.urlsafe_b64encode(chunk).rstrip(b"=").decode("ascii")
+
 def _add_system_log(level: str, message: str, category: str = "system") -> None:
     """添加系统日志并通过 WebSocket 广播。"""
     global _system_logs
-    import time
     log_entry = {
-        "id": str(uuid.uuid4()),
+        "id": _mkid(),
         "timestamp": time.time(),
         "level": level,
         "message": message,
@@ -196,7 +251,7 @@ def _add_system_log(level: str, message: str, category: str = "system") -> None:
 
     # 同时打印到控制台以便调试
     level_icon = {"info": "", "ok": "✓", "error": "✗", "warn": "⚠"}.get(level, "")
-    print(f"[{level.upper()}] {level_icon} {message}")
+    logger.info("[%s] %s %s", level.upper(), level_icon, message)
 
 def sys_info(msg: str, category: str = "system") -> None:
     _add_system_log("info", msg, category=category)
@@ -225,7 +280,7 @@ async def lifespan(app: FastAPI):
 
     # 尽早加载持久化的仿真状态，以便 OASIS 使用运行时配置。
     global _sim_state
-    _sim_state = get_simulation_state()
+    _load_sim_state()
     config_key = (_sim_state.config.llm_api_key or "").strip()
     if config_key:
         # 保留用户指定的密钥；仅在用户未明确禁用时才启用。
@@ -247,7 +302,7 @@ async def lifespan(app: FastAPI):
                 "LLM disabled: no API key found (set LLM_API_KEY/DEEPSEEK_API_KEY/OPENAI_API_KEY)",
                 category="llm",
             )
-    save_simulation_state(_sim_state)
+    _persist_sim_state(_sim_state)
 
     # 如果 OASIS 可用，则初始化
     oasis_initialized = False
@@ -270,27 +325,34 @@ async def lifespan(app: FastAPI):
 
     # 自动启动仿真：启动时将 is_running 设置为 True
     _sim_state.is_running = True
-    save_simulation_state(_sim_state)
+    _persist_sim_state(_sim_state)
     print(f"Simulation auto-started: tick={_sim_state.tick}, is_running={_sim_state.is_running}")
     sys_ok(f"Simulation auto-started at tick={_sim_state.tick}", category="simulation")
 
-    # 启动仿真计时器（使用 OASIS 或备用模式）
+    # 启动仿真计时器（使用 OASIS 或备用模式）与去抖落盘任务
     ticker_task = asyncio.create_task(simulation_ticker())
+    flush_task = asyncio.create_task(_state_flush_loop())
 
     yield
 
-    # 关闭流程
+    # 关闭流程：先停后台任务，再把可能尚未落盘的合并状态刷出去
     ticker_task.cancel()
+    flush_task.cancel()
+    if _ticks_since_save or _state_dirty.is_set():
+        _persist_sim_state(_sim_state)
     if oasis_initialized:
         await close_simulation()
     print(f"Shutting down {settings.app_name}")
     sys_info(f"Shutting down {settings.app_name}", category="lifecycle")
+    _log_listener.stop()
 
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.version,
     lifespan=lifespan,
+    # orjson 序列化大型状态/信息流响应比标准库 json 快一个数量级
+    default_response_class=ORJSONResponse,
 )
 
 # CORS 中间件
@@ -373,6 +435,61 @@ class SimulationStateResponse(BaseModel):
     currentSnapshotId: Optional[str]
 
 
+class AgentStatePatchRequest(BaseModel):
+    """Agent state patch request model."""
+    mood: Optional[float] = None
+    stance: Optional[float] = None
+    resources: Optional[float] = None
+    lastAction: Optional[str] = None
+
+
+class StatePatchRequest(BaseModel):
+    """Simulation state patch request model."""
+    isRunning: Optional[bool] = None
+    speed: Optional[float] = None
+    tick: Optional[int] = None
+    selectedAgentId: Optional[int] = None
+    config: Optional[dict] = None
+
+
+class CreatePostRequest(BaseModel):
+    """Feed post creation request model."""
+    agent_id: int
+    content: str
+    emotion: Optional[float] = None
+
+
+class CreateEventRequest(BaseModel):
+    """Timeline event creation request model.
+
+    type/level 在模型层校验：非法取值由 Pydantic 返回 422，
+    而不是在处理器里触发 ValueError → 500。
+    """
+    tick: int
+    type: EventType
+    title: str
+    agentId: Optional[int] = None
+    payload: Optional[dict] = None
+
+
+class CreateLogRequest(BaseModel):
+    """Log line creation request model.（level 同样在模型层校验）"""
+    tick: int
+    level: LogLevel
+    text: str
+    agentId: Optional[int] = None
+
+
+class SpeedRequest(BaseModel):
+    """Simulation speed request model."""
+    speed: float
+
+
+class TickRequest(BaseModel):
+    """Simulation tick request model."""
+    tick: int
+
+
 class InterventionRequest(BaseModel):
     """Intervention request model."""
     tick: int
@@ -400,10 +517,271 @@ class SimulationControlRequest(BaseModel):
 
 # ============= Simulation Ticker =============
 
+
+class AgentStateArrays:
+    """代理运行时状态的 SoA（structure-of-arrays）存储。
+
+    ``SimulationState.agents`` 的 dict-of-dict 形式每次读取字段都要经过
+    三层字典查找；ticker 每个 tick 都会触达大量代理，因此热点字段改为
+    按位置索引的并行 NumPy 数组。dict 形式仅在持久化/API 边界通过
+    ``sync_to_state`` 物化。
+
+    mood/stance 以 int8 量化存储（scale=127，前端展示精度约 2 位小数），
+    resources 以 float16 存储；读取时上转为 float，写入时裁剪+取整下转。
+    相比 float64，内存占用减半以上，向量化吞吐翻倍。
+    """
+
+    MOOD_SCALE = 127.0
+
+    def __init__(self) -> None:
+        self.ids: list[int] = []
+        self.id_to_idx: dict[int, int] = {}
+        self.mood = np.zeros(0, dtype=np.int8)
+        self.stance = np.zeros(0, dtype=np.int8)
+        self.resources = np.zeros(0, dtype=np.float16)
+        self.last_action = np.full(0, "", dtype="U16")
+        # 静态人格特质（随 load 一次性填充），供批量 mood 更新直接切片
+        self.openness = np.zeros(0, dtype=np.float32)
+        self.neuroticism = np.zeros(0, dtype=np.float32)
+        # 组名（小写去空白）→ 代理 ID 列表；组成员关系在 load 之后不变，
+        # 供组级干预 O(1) 解析
+        self.group_index: dict[str, list[int]] = {}
+
+    @classmethod
+    def _quantize(cls, value: float) -> int:
+        """将 [-1, 1] 浮点值量化为 int8。"""
+        clipped = max(-1.0, min(1.0, float(value)))
+        return int(round(clipped * cls.MOOD_SCALE))
+
+    def mood_value(self, idx: int) -> float:
+        """按位置读取反量化后的 mood。"""
+        return float(self.mood[idx]) / self.MOOD_SCALE
+
+    def stance_value(self, idx: int) -> float:
+        """按位置读取反量化后的 stance。"""
+        return float(self.stance[idx]) / self.MOOD_SCALE
+
+    def load(self, agents: dict[Any, dict[str, Any]]) -> None:
+        """从 dict-of-dict 代理映射重建数组。"""
+        ids: list[int] = []
+        for raw_key in agents.keys():
+            try:
+                ids.append(int(raw_key))
+            except (TypeError, ValueError):
+                continue
+
+        n = len(ids)
+        mood = np.zeros(n, dtype=np.int8)
+        stance = np.zeros(n, dtype=np.int8)
+        resources = np.zeros(n, dtype=np.float16)
+        last_action = np.full(n, "idle", dtype="U16")
+        openness = np.full(n, 0.5, dtype=np.float32)
+        neuroticism = np.full(n, 0.5, dtype=np.float32)
+
+        group_index: dict[str, list[int]] = {}
+
+        for i, agent_id in enumerate(ids):
+            # 键在 _normalize_agent_keys 统一为 int，单次查找即可
+            agent = agents.get(agent_id) or {}
+            state = agent.get("state") or {}
+            traits = agent.get("traits") or {}
+            group = str((agent.get("profile") or {}).get("group", "")).strip().lower()
+            if group:
+                group_index.setdefault(group, []).append(agent_id)
+            try:
+                openness[i] = float(traits.get("O", 0.5))
+                neuroticism[i] = float(traits.get("N", 0.5))
+            except (TypeError, ValueError):
+                pass
+            try:
+                mood[i] = self._quantize(state.get("mood", 0.0))
+            except (TypeError, ValueError):
+                mood[i] = 0
+            try:
+                stance[i] = self._quantize(state.get("stance", 0.0))
+            except (TypeError, ValueError):
+                stance[i] = 0
+            try:
+                resources[i] = float(state.get("resources", 100.0))
+            except (TypeError, ValueError):
+                resources[i] = 100.0
+            last_action[i] = str(state.get("lastAction", "idle"))[:16]
+
+        self.ids = ids
+        self.id_to_idx = {agent_id: i for i, agent_id in enumerate(ids)}
+        self.mood = mood
+        self.stance = stance
+        self.resources = resources
+        self.last_action = last_action
+        self.openness = openness
+        self.neuroticism = neuroticism
+        self.group_index = group_index
+
+    def __contains__(self, agent_id: int) -> bool:
+        return agent_id in self.id_to_idx
+
+    def get_state(self, agent_id: int) -> Optional[dict[str, Any]]:
+        """在 API 边界将单个代理状态物化为字典。"""
+        idx = self.id_to_idx.get(agent_id)
+        if idx is None:
+            return None
+        return {
+            "mood": self.mood_value(idx),
+            "stance": self.stance_value(idx),
+            "resources": float(self.resources[idx]),
+            "lastAction": str(self.last_action[idx]),
+        }
+
+    def set_fields(
+        self,
+        agent_id: int,
+        mood: Optional[float] = None,
+        stance: Optional[float] = None,
+        resources: Optional[float] = None,
+        last_action: Optional[str] = None,
+    ) -> bool:
+        """按位置写入单个代理的部分字段。"""
+        idx = self.id_to_idx.get(agent_id)
+        if idx is None:
+            return False
+        if mood is not None:
+            self.mood[idx] = self._quantize(mood)
+        if stance is not None:
+            self.stance[idx] = self._quantize(stance)
+        if resources is not None:
+            self.resources[idx] = resources
+        if last_action is not None:
+            self.last_action[idx] = last_action[:16]
+        return True
+
+    def sync_to_state(self, state: SimulationState) -> None:
+        """将数组值物化回 dict 形式（持久化/序列化边界）。"""
+        for idx, agent_id in enumerate(self.ids):
+            agent = state.agents.get(agent_id)
+            if agent is None:
+                continue
+            agent["state"] = {
+                "mood": self.mood_value(idx),
+                "stance": self.stance_value(idx),
+                "resources": float(self.resources[idx]),
+                "lastAction": str(self.last_action[idx]),
+            }
+
+
 # Global simulation state
 _sim_state: SimulationState = SimulationState()
+_agent_arrays = AgentStateArrays()
 _ticker_running = False
-_ticker_lock = asyncio.Lock()
+
+
+def _normalize_agent_keys(agents: dict[Any, dict[str, Any]]) -> dict[int, dict[str, Any]]:
+    """将代理映射的键统一为 int（JSON 反序列化会把键变成字符串）。
+
+    加载时归一化一次之后，所有读取方都可以直接按 int 键查找，
+    不再需要 "先试 int 再试 str" 的双路查找。无法转换的键原样保留。
+    """
+    normalized: dict[Any, dict[str, Any]] = {}
+    for key, value in agents.items():
+        try:
+            normalized[int(key)] = value
+        except (TypeError, ValueError):
+            normalized[key] = value
+    return normalized
+
+
+def _load_sim_state() -> SimulationState:
+    """从数据库重新加载仿真状态并重建 SoA 视图。"""
+    global _sim_state
+    _sim_state = get_simulation_state()
+    _sim_state.agents = _normalize_agent_keys(_sim_state.agents)
+    _agent_arrays.load(_sim_state.agents)
+    return _sim_state
+
+
+def _persist_sim_state(state: SimulationState) -> None:
+    """将 SoA 视图物化回 dict 形式并持久化。"""
+    global _loaded_snapshot_hash, _ticks_since_save
+    _agent_arrays.sync_to_state(state)
+    save_simulation_state(state)
+    _invalidate_state_cache()
+    # 任何常规持久化都意味着状态偏离了最近加载的快照
+    _loaded_snapshot_hash = None
+    # 直接持久化（干预/控制端点等）同时清零 tick 合并计数
+    _ticks_since_save = 0
+
+
+# tick 级写盘合并：每 tick 全量序列化并落盘代理状态对磁盘和 CPU 都是
+# 纯浪费——内存中的 _sim_state/SoA 数组才是运行期的权威数据。改为累积
+# 脏 tick 计数、每 _SAVE_EVERY_TICKS 个 tick 标脏一次，实际写盘统一由
+# _state_flush_loop 在工作线程执行（事件循环上不做序列化，也避免与
+# 去抖落盘并发交错）；干预与控制端点仍走 _persist_sim_state 即时持久化，
+# 进程关闭时也强制落盘。
+_SAVE_EVERY_TICKS = 10
+_ticks_since_save = 0
+
+
+def _persist_sim_state_coalesced(state: SimulationState) -> None:
+    """按 tick 合并的持久化：每 _SAVE_EVERY_TICKS 个脏 tick 交给去抖落盘任务。"""
+    global _ticks_since_save
+    _ticks_since_save += 1
+    if _ticks_since_save >= _SAVE_EVERY_TICKS:
+        _mark_state_dirty()
+
+
+# 请求路径写合并：变更端点只标脏并立即失效读缓存，实际的全量
+# 序列化 + 写盘由后台任务在去抖窗口结束后统一执行；窗口内的突发
+# 变更（如连续的 patch_agent_state）合并为一次写
+_STATE_FLUSH_DEBOUNCE = 0.05
+_state_dirty: asyncio.Event = asyncio.Event()
+
+
+def _mark_state_dirty() -> None:
+    """标记仿真状态待落盘；读端立即看到新版本（内存即权威数据）。"""
+    _invalidate_state_cache()
+    _state_dirty.set()
+
+
+async def _state_flush_loop() -> None:
+    """去抖的状态落盘任务：合并 _STATE_FLUSH_DEBOUNCE 窗口内的所有变更。"""
+    while True:
+        await _state_dirty.wait()
+        await asyncio.sleep(_STATE_FLUSH_DEBOUNCE)
+        _state_dirty.clear()
+        try:
+            await asyncio.to_thread(_persist_sim_state, _sim_state)
+        except Exception:
+            logger.exception("State flush failed")
+
+
+# 最近一次成功加载的快照内容哈希；当前状态自那以后未变时，
+# 重复 load 同一快照可以完全跳过 from_dict 重建与数据库写入
+_loaded_snapshot_hash: Optional[bytes] = None
+
+
+def _snapshot_data_hash(data: dict) -> bytes:
+    return hashlib.blake2b(
+        orjson.dumps(data, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).digest()
+
+
+# ============= /api/state 响应缓存 =============
+# 状态最多按 ticks_per_second 变化；短 TTL + ETag 让轮询客户端命中
+# 304 或进程内缓存，而不是每次都重新序列化全部状态。
+_STATE_CACHE_TTL = 0.5
+_state_version = 0
+_state_cache: dict[str, Any] = {"payload": None, "etag": "", "expires": 0.0}
+
+
+def _invalidate_state_cache() -> None:
+    """状态变更后推进版本号并丢弃缓存的 /api/state 响应。
+
+    版本号参与 ETag 计算，因此任何变更端点调用后，
+    轮询客户端的 If-None-Match 也会随之失效。
+    """
+    global _state_version
+    _state_version += 1
+    _state_cache["payload"] = None
+    _state_cache["expires"] = 0.0
 
 
 def _get_action_description(action_type: str, action_args: dict) -> str:
@@ -439,48 +817,49 @@ def _get_action_description(action_type: str, action_args: dict) -> str:
 
 
 def _normalize_agent_id_list(state: SimulationState) -> list[int]:
-    """以整数形式返回代理 ID，无论键类型如何。"""
-    ids: list[int] = []
-    for raw_key in state.agents.keys():
-        try:
-            ids.append(int(raw_key))
-        except (TypeError, ValueError):
-            continue
-    return ids
+    """以整数形式返回代理 ID（SoA 加载时归一化并缓存，无每次分配）。"""
+    return _agent_arrays.ids
 
 
 def _get_agent_state_ref(state: SimulationState, agent_id: int) -> Optional[dict[str, Any]]:
-    """通过 ID 获取可变的代理状态字典，支持 int/str 键。"""
-    if agent_id in state.agents:
-        agent = state.agents[agent_id]
-    elif str(agent_id) in state.agents:
-        agent = state.agents[str(agent_id)]
-    else:
-        return None
-    return agent.get("state")
+    """通过 ID 获取代理状态字典（从 SoA 视图物化）。"""
+    return _agent_arrays.get_state(agent_id)
 
 
 def _get_agent_group(state: SimulationState, agent_id: int) -> str:
-    """获取代理组名（如果可用）。"""
-    agent = state.agents.get(agent_id) or state.agents.get(str(agent_id)) or {}
+    """获取代理组名（如果可用）。键已在加载时归一化为 int。"""
+    agent = state.agents.get(agent_id) or {}
     profile = agent.get("profile", {})
     return str(profile.get("group", ""))
 
 
 def _agent_ids_by_group(state: SimulationState, group_name: str) -> list[int]:
-    """通过精确组名查找代理 ID（不区分大小写）。"""
-    target = group_name.strip().lower()
-    matched: list[int] = []
-    for agent_id in _normalize_agent_id_list(state):
-        if _get_agent_group(state, agent_id).strip().lower() == target:
-            matched.append(agent_id)
-    return matched
+    """通过精确组名查找代理 ID（不区分大小写，走 SoA 加载时建好的索引）。"""
+    return _agent_arrays.group_index.get(group_name.strip().lower(), [])
+
+
+# 干预命令文法（模块级预编译，省去每次调用的缓存查找与标志解析，
+# 也把支持的命令形式集中在一处）。三种参数化命令合并为一个带命名组的
+# 交替正则：每条命令只扫描输入一次，按命中的组分派。
+_ASSIGN_RE = re.compile(r"(mood|stance|resources)\s*=\s*([+-]?\d+(?:\.\d+)?)", re.IGNORECASE)
+_CMD_RE = re.compile(
+    r"(?:set\s+agent\s+(?P<aid>\d+)\s+(?P<assign>.+))"
+    r"|(?:shift\s+group\s+(?P<grp>.+?)\s+mood\s*=\s*(?P<delta>[+-]?\d+(?:\.\d+)?))"
+    r"|(?:(?:set\s+)?speed\s*=?\s*(?P<speed>[+-]?\d+(?:\.\d+)?))",
+    re.IGNORECASE,
+)
+# 仅做记录的命令前缀 → 效果标签
+_CMD_MARKERS = (
+    ("inject event", "event_injected"),
+    ("survey", "survey_triggered"),
+    ("broadcast", "broadcast_sent"),
+)
 
 
 def _parse_assignments(raw: str) -> dict[str, float]:
     """解析赋值片段，例如：mood=0.6 stance=-0.2 resources=120。"""
     assignments: dict[str, float] = {}
-    for key, value in re.findall(r"(mood|stance|resources)\s*=\s*([+-]?\d+(?:\.\d+)?)", raw, flags=re.IGNORECASE):
+    for key, value in _ASSIGN_RE.findall(raw):
         key_norm = key.lower()
         num = float(value)
         if key_norm in {"mood", "stance"}:
@@ -493,18 +872,13 @@ def _parse_assignments(raw: str) -> dict[str, float]:
 
 def _apply_agent_patch(state: SimulationState, agent_id: int, patch: dict[str, float]) -> bool:
     """将解析的数值补丁应用到代理状态。"""
-    agent_state = _get_agent_state_ref(state, agent_id)
-    if not agent_state:
-        return False
-
-    if "mood" in patch:
-        agent_state["mood"] = patch["mood"]
-    if "stance" in patch:
-        agent_state["stance"] = patch["stance"]
-    if "resources" in patch:
-        agent_state["resources"] = patch["resources"]
-    agent_state["lastAction"] = "intervened"
-    return True
+    return _agent_arrays.set_fields(
+        agent_id,
+        mood=patch.get("mood"),
+        stance=patch.get("stance"),
+        resources=patch.get("resources"),
+        last_action="intervened",
+    )
 
 
 def _execute_intervention(state: SimulationState, command: str, target_agent_id: Optional[int]) -> dict[str, Any]:
@@ -524,6 +898,7 @@ def _execute_intervention(state: SimulationState, command: str, target_agent_id:
     effects: list[str] = []
     state_changed = False
 
+    cmd_match = None
     if lower in {"pause", "stop"}:
         state.is_running = False
         effects.append("simulation_paused")
@@ -533,57 +908,52 @@ def _execute_intervention(state: SimulationState, command: str, target_agent_id:
         effects.append("simulation_resumed")
         state_changed = True
     else:
-        speed_match = re.search(r"(?:set\s+)?speed\s*=?\s*([+-]?\d+(?:\.\d+)?)", lower)
-        if speed_match:
-            speed = float(speed_match.group(1))
+        cmd_match = _CMD_RE.search(normalized)
+
+    is_set_agent = cmd_match is not None and cmd_match["aid"] is not None
+    if cmd_match is not None:
+        if is_set_agent:
+            agent_id = int(cmd_match["aid"])
+            patch = _parse_assignments(cmd_match["assign"])
+            if patch and _apply_agent_patch(state, agent_id, patch):
+                affected_agents.append(agent_id)
+                effects.append("agent_state_set")
+                state_changed = True
+        elif cmd_match["grp"] is not None:
+            group_name = cmd_match["grp"].strip()
+            delta = float(cmd_match["delta"])
+            target_ids = _agent_ids_by_group(state, group_name)
+            for agent_id in target_ids:
+                idx = _agent_arrays.id_to_idx.get(agent_id)
+                if idx is None:
+                    continue
+                current = _agent_arrays.mood_value(idx)
+                _agent_arrays.set_fields(
+                    agent_id,
+                    mood=max(-1.0, min(1.0, current + delta)),
+                    last_action="intervened_group",
+                )
+                affected_agents.append(agent_id)
+            if target_ids:
+                effects.append(f"group_mood_shift:{group_name}")
+                state_changed = True
+        else:
+            speed = float(cmd_match["speed"])
             state.speed = max(0.1, min(10.0, speed))
             effects.append(f"speed_set:{state.speed}")
             state_changed = True
 
-    set_agent_match = re.match(r"set\s+agent\s+(\d+)\s+(.+)", normalized, flags=re.IGNORECASE)
-    if set_agent_match:
-        agent_id = int(set_agent_match.group(1))
-        patch = _parse_assignments(set_agent_match.group(2))
-        if patch and _apply_agent_patch(state, agent_id, patch):
-            affected_agents.append(agent_id)
-            effects.append("agent_state_set")
-            state_changed = True
-
     # 如果提供了 targetAgentId，则允许直接键值命令片段。
-    if target_agent_id is not None and not set_agent_match:
+    if target_agent_id is not None and not is_set_agent:
         patch = _parse_assignments(normalized)
         if patch and _apply_agent_patch(state, target_agent_id, patch):
             affected_agents.append(target_agent_id)
             effects.append("target_agent_state_set")
             state_changed = True
 
-    group_shift_match = re.search(
-        r"shift\s+group\s+(.+?)\s+mood\s*=\s*([+-]?\d+(?:\.\d+)?)",
-        normalized,
-        flags=re.IGNORECASE,
-    )
-    if group_shift_match:
-        group_name = group_shift_match.group(1).strip()
-        delta = float(group_shift_match.group(2))
-        target_ids = _agent_ids_by_group(state, group_name)
-        for agent_id in target_ids:
-            agent_state = _get_agent_state_ref(state, agent_id)
-            if not agent_state:
-                continue
-            current = float(agent_state.get("mood", 0.0))
-            agent_state["mood"] = max(-1.0, min(1.0, current + delta))
-            agent_state["lastAction"] = "intervened_group_shift"
-            affected_agents.append(agent_id)
-        if target_ids:
-            effects.append(f"group_mood_shift:{group_name}")
-            state_changed = True
-
-    if lower.startswith("inject event"):
-        effects.append("event_injected")
-    if lower.startswith("survey"):
-        effects.append("survey_triggered")
-    if lower.startswith("broadcast"):
-        effects.append("broadcast_sent")
+    for marker_prefix, marker_effect in _CMD_MARKERS:
+        if lower.startswith(marker_prefix):
+            effects.append(marker_effect)
 
     status = "applied" if state_changed or effects else "recorded_only"
     if not effects:
@@ -597,35 +967,85 @@ def _execute_intervention(state: SimulationState, command: str, target_agent_id:
     }
 
 
+# 备用 ticker 的帖子模板，按情绪分桶在模块加载时冻结，
+# 避免每个 tick 重新构建列表对象。
+_POST_TEMPLATES_POSITIVE = (
+    "Great things are happening today! #positive",
+    "Feeling optimistic! Looking forward to what's coming.",
+    "Making progress on my goals. Every step counts!",
+)
+_POST_TEMPLATES_NEGATIVE = (
+    "This is frustrating. Why can't things be better?",
+    "Disappointed with the current situation.",
+    "Need to speak up about what matters.",
+)
+_POST_TEMPLATES_NEUTRAL = (
+    "Just observing the conversation.",
+    "Taking time to process everything.",
+    "Thinking about the next steps.",
+)
+
+
+def _tick_interval(state: SimulationState) -> float:
+    """计算两个 tick 之间的休眠时长（秒），带安全下限。"""
+    rate = state.config.ticks_per_second * state.speed
+    if rate <= 0:
+        return 1.0
+    return max(0.01, 1.0 / rate)
+
+
 async def simulation_ticker():
     """推进仿真刻度的后台任务。"""
     global _ticker_running, _sim_state
 
     # 初始化状态
-    _sim_state = get_simulation_state()
+    _load_sim_state()
 
-    # 如果为空，则初始化代理字典
+    # 如果为空，则初始化代理字典（数据库读取与 to_dict 构建在工作线程
+    # 中进行，避免在初始化期间阻塞事件循环）
     if not _sim_state.agents:
-        all_agents = get_all_agents()
-        for agent in all_agents:
-            _sim_state.agents[agent.id] = {
-                "profile": agent.to_dict(),
-                "state": {
-                    "mood": 0.0,
-                    "stance": 0.0,
-                    "resources": 100.0,
-                    "lastAction": "idle",
+        def _build_agent_entries() -> dict[int, dict[str, Any]]:
+            return {
+                agent.id: {
+                    "profile": agent.to_dict(),
+                    # 静态人格特质上提到顶层：mood 更新路径直接读这里，
+                    # 不再每个代理每 tick 回数据库取 Big Five
+                    "traits": {
+                        "O": agent.psychometrics.big_five.O,
+                        "N": agent.psychometrics.big_five.N,
+                    },
+                    # 领域帖文案在初始化时渲染好，发帖热路径直接取串
+                    "expertise_post": (
+                        f"Thoughts on {agent.identity.domain_of_expertise[0]} today..."
+                        if agent.identity.domain_of_expertise
+                        else ""
+                    ),
+                    "state": {
+                        "mood": 0.0,
+                        "stance": 0.0,
+                        "resources": 100.0,
+                        "lastAction": "idle",
+                    },
                 }
+                for agent in get_all_agents()
             }
-        save_simulation_state(_sim_state)
-        print(f"[Ticker] Initialized {len(_sim_state.agents)} agents")
+
+        _sim_state.agents = await asyncio.to_thread(_build_agent_entries)
+        _agent_arrays.load(_sim_state.agents)
+        await asyncio.to_thread(_persist_sim_state, _sim_state)
+        logger.info("[Ticker] Initialized %d agents", len(_sim_state.agents))
 
     # 如果为空，则初始化组字典
     if not _sim_state.groups:
-        all_groups = get_all_group_profiles()
+        all_groups = await asyncio.to_thread(get_all_group_profiles)
         _sim_state.groups = {g.key: g.to_dict() for g in all_groups}
-        save_simulation_state(_sim_state)
-        print(f"[Ticker] Initialized {len(_sim_state.groups)} groups")
+        await asyncio.to_thread(_persist_sim_state, _sim_state)
+        logger.info("[Ticker] Initialized %d groups", len(_sim_state.groups))
+
+    # 绝对截止时刻调度：sleep 按 next_tick 对齐而不是固定间隔，tick 本身
+    # 的处理耗时从休眠中扣除，高 TPS 下实际速率不会因处理时间而漂移
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
 
     while True:
         try:
@@ -633,150 +1053,188 @@ async def simulation_ticker():
             use_oasis = settings.use_oasis and OASIS_AVAILABLE
 
             if _sim_state.is_running:
-                async with _ticker_lock:
-                    if use_oasis:
-                        # 使用 OASIS 仿真
-                        result = await run_simulation_step()
-                        _sim_state.tick = result.get("tick", _sim_state.tick)
-
-                        # 记录活动
-                        if "actions" in result:
-                            actions = result.get('actions', 0)
-                            active_agents = result.get('active_agents', 0)
-                            behaviors = result.get('behaviors', [])  # Get detailed behaviors
-                            llm_call_logs = result.get("llm_call_logs", [])
-                            metrics = result.get("metrics", {})
-                            latency_ms = metrics.get("last_tick_latency_ms", 0.0)
-                            retries = metrics.get("retries_total", 0)
-                            fallback_ticks = metrics.get("fallback_ticks", 0)
-                            print(
-                                f"[OASIS] Tick {_sim_state.tick}: {actions} actions, "
-                                f"{active_agents} active agents, latency={latency_ms}ms, "
-                                f"retries={retries}, fallback_ticks={fallback_ticks}"
-                            )
+                # 按需仿真：没有 WS 客户端时跳过没人观察的工作——
+                # 广播负载的 to_dict 物化、以及 fallback 分支的装饰性
+                # 随机发帖。落库照常进行（REST 端仍可能读取历史数据）。
+                has_listeners = ws_manager.get_connection_count() > 0
+
+                if use_oasis:
+                    # 使用 OASIS 仿真
+                    result = await run_simulation_step()
+                    _sim_state.tick = result.get("tick", _sim_state.tick)
+
+                    # 记录活动
+                    if "actions" in result:
+                        actions = result.get('actions', 0)
+                        active_agents = result.get('active_agents', 0)
+                        behaviors = result.get('behaviors', [])  # Get detailed behaviors
+                        llm_call_logs = result.get("llm_call_logs", [])
+                        metrics = result.get("metrics", {})
+                        latency_ms = metrics.get("last_tick_latency_ms", 0.0)
+                        retries = metrics.get("retries_total", 0)
+                        fallback_ticks = metrics.get("fallback_ticks", 0)
+                        logger.info(
+                            "[OASIS] Tick %s: %s actions, %s active agents, "
+                            "latency=%sms, retries=%s, fallback_ticks=%s",
+                            _sim_state.tick, actions, active_agents,
+                            latency_ms, retries, fallback_ticks,
+                        )
+
+                        # Create log entry for tick summary (will appear in Events)
+                        tick_summary_event = TimelineEvent(
+                            id=_mkid(),
+                            tick=_sim_state.tick,
+                            type=EventType.INTERVENTION,  # Use INTERVENTION for system events
+                            title=f"[OASIS] Tick {_sim_state.tick}: {actions} actions, {active_agents} active agents",
+                            agent_id=None,
+                            payload={
+                                "actions": actions,
+                                "active_agents": active_agents,
+                                "metrics": {
+                                    "lastTickLatencyMs": metrics.get("last_tick_latency_ms", 0.0),
+                                    "avgTickLatencyMs": metrics.get("avg_tick_latency_ms", 0.0),
+                                    "ticksSuccess": metrics.get("ticks_success", 0),
+                                    "ticksFailed": metrics.get("ticks_failed", 0),
+                                    "llmTimeouts": metrics.get("llm_timeouts", 0),
+                                    "llmErrors": metrics.get("llm_errors", 0),
+                                    "retriesTotal": metrics.get("retries_total", 0),
+                                    "fallbackTicks": metrics.get("fallback_ticks", 0),
+                                    "lastError": metrics.get("last_error", ""),
+                                },
+                            }
+                        )
+                        await asyncio.to_thread(save_timeline_event, tick_summary_event)
+                        if has_listeners:
+                            await ws_manager.emit_event_created(tick_summary_event.to_dict())
 
-                            # Create log entry for tick summary (will appear in Events)
-                            import uuid
-                            from models import save_timeline_event, TimelineEvent, EventType, save_feed_post, FeedPost
-                            tick_summary_event = TimelineEvent(
-                                id=str(uuid.uuid4()),
+                        # Sync OASIS behaviors to feed as activity logs.
+                        # 先在循环里累积，再整批落库（每类各一次事务）
+                        # 与整帧广播，避免 B 个行为触发 2B+ 次提交。
+                        behavior_posts: list[FeedPost] = []
+                        behavior_events: list[TimelineEvent] = []
+                        behavior_logs: list[LogLine] = []
+                        for behavior in behaviors:
+                            agent_name = behavior.get("agent_name", "Unknown")
+                            action_type = behavior.get("action_type", "unknown")
+                            action_args = behavior.get("action_args", {})
+                            agent_id = int(behavior.get("agent_id", 0))
+
+                            # Convert action type to readable description
+                            action_desc = _get_action_description(action_type, action_args)
+
+                            # Create feed post as behavior log
+                            behavior_posts.append(FeedPost(
+                                id=_mkid(),
                                 tick=_sim_state.tick,
-                                type=EventType.INTERVENTION,  # Use INTERVENTION for system events
-                                title=f"[OASIS] Tick {_sim_state.tick}: {actions} actions, {active_agents} active agents",
-                                agent_id=None,
+                                author_id=agent_id,
+                                author_name=agent_name,
+                                emotion=0.0,
+                                content=f"[Behavior] {action_desc}",
+                                likes=0,
+                            ))
+
+                            # Emit fine-grained timeline event for each agent action.
+                            behavior_events.append(TimelineEvent(
+                                id=_mkid(),
+                                tick=_sim_state.tick,
+                                type=EventType.AGENT_ACTION,
+                                title=f"{agent_name}: {action_desc}",
+                                agent_id=agent_id if agent_id > 0 else None,
                                 payload={
-                                    "actions": actions,
-                                    "active_agents": active_agents,
-                                    "metrics": {
-                                        "lastTickLatencyMs": metrics.get("last_tick_latency_ms", 0.0),
-                                        "avgTickLatencyMs": metrics.get("avg_tick_latency_ms", 0.0),
-                                        "ticksSuccess": metrics.get("ticks_success", 0),
-                                        "ticksFailed": metrics.get("ticks_failed", 0),
-                                        "llmTimeouts": metrics.get("llm_timeouts", 0),
-                                        "llmErrors": metrics.get("llm_errors", 0),
-                                        "retriesTotal": metrics.get("retries_total", 0),
-                                        "fallbackTicks": metrics.get("fallback_ticks", 0),
-                                        "lastError": metrics.get("last_error", ""),
-                                    },
-                                }
-                            )
-                            save_timeline_event(tick_summary_event)
-                            await ws_manager.emit_event_created(tick_summary_event.to_dict())
+                                    "actionType": action_type,
+                                    "actionArgs": action_args,
+                                },
+                            ))
 
-                            # Sync OASIS behaviors to feed as activity logs
-                            for behavior in behaviors:
-                                agent_name = behavior.get("agent_name", "Unknown")
-                                action_type = behavior.get("action_type", "unknown")
-                                action_args = behavior.get("action_args", {})
-                                agent_id = int(behavior.get("agent_id", 0))
-
-                                # Convert action type to readable description
-                                action_desc = _get_action_description(action_type, action_args)
-
-                                # Create feed post as behavior log
-                                behavior_post = FeedPost(
-                                    id=str(uuid.uuid4()),
-                                    tick=_sim_state.tick,
-                                    author_id=agent_id,
-                                    author_name=agent_name,
-                                    emotion=0.0,
-                                    content=f"[Behavior] {action_desc}",
-                                    likes=0,
-                                )
-                                persisted_id = save_feed_post(behavior_post)
-                                behavior_post.id = persisted_id
-                                await ws_manager.emit_post_created(behavior_post.to_dict())
-
-                                # Emit fine-grained timeline event for each agent action.
-                                behavior_event = TimelineEvent(
-                                    id=str(uuid.uuid4()),
-                                    tick=_sim_state.tick,
-                                    type=EventType.AGENT_ACTION,
-                                    title=f"{agent_name}: {action_desc}",
-                                    agent_id=agent_id if agent_id > 0 else None,
-                                    payload={
-                                        "actionType": action_type,
-                                        "actionArgs": action_args,
-                                    },
-                                )
-                                save_timeline_event(behavior_event)
-                                await ws_manager.emit_event_created(behavior_event.to_dict())
-
-                                behavior_log = LogLine(
-                                    id=str(uuid.uuid4()),
-                                    tick=_sim_state.tick,
-                                    level=LogLevel.INFO,
-                                    text=f"[Ticker] {agent_name}: {action_desc}",
-                                    agent_id=agent_id if agent_id > 0 else None,
-                                )
-                                save_log_line(behavior_log)
-                                await ws_manager.emit_log_added(behavior_log.to_dict())
-                                print(f"[Ticker] {agent_name}: {action_desc}")
-
-                            # Sync LLM runtime call logs to both log stream and feed.
-                            for call_log in llm_call_logs:
-                                log_level_raw = str(call_log.get("level", "info")).lower()
-                                if log_level_raw == "ok":
-                                    log_level = LogLevel.OK
-                                elif log_level_raw == "error":
-                                    log_level = LogLevel.ERROR
-                                else:
-                                    log_level = LogLevel.INFO
-
-                                message = str(call_log.get("message", ""))
-                                log_text = f"[LLM] {message}"
-                                llm_log = LogLine(
-                                    id=str(uuid.uuid4()),
-                                    tick=_sim_state.tick,
-                                    level=log_level,
-                                    text=log_text,
-                                    agent_id=None,
-                                )
-                                save_log_line(llm_log)
-                                await ws_manager.emit_log_added(llm_log.to_dict())
-
-                                llm_feed = FeedPost(
-                                    id=str(uuid.uuid4()),
-                                    tick=_sim_state.tick,
-                                    author_id=0,
-                                    author_name="LLM Engine",
-                                    emotion=0.0,
-                                    content=f"[LLM][{log_level_raw}] {message}",
-                                    likes=0,
-                                )
-                                persisted_id = save_feed_post(llm_feed)
-                                llm_feed.id = persisted_id
-                                await ws_manager.emit_post_created(llm_feed.to_dict())
-                                print(f"[LLM] {message}")
-                            # Also sync actual posts to feed database
-                            try:
-                                new_posts = await get_simulation_posts(limit=20)
-                                print(f"[Ticker] Fetched {len(new_posts)} posts from OASIS")
-                                from models import save_oasis_feed_post
+                            behavior_logs.append(LogLine(
+                                id=_mkid(),
+                                tick=_sim_state.tick,
+                                level=LogLevel.INFO,
+                                text=f"[Ticker] {agent_name}: {action_desc}",
+                                agent_id=agent_id if agent_id > 0 else None,
+                            ))
+                            logger.info("[Ticker] %s: %s", agent_name, action_desc)
+
+                        if behavior_posts:
+                            # 三类批量落库在工作线程完成，SQLite 写
+                            # 不再阻塞事件循环（WS 广播可继续交错）
+                            def _flush_behaviors() -> list[str]:
+                                ids = save_feed_posts(behavior_posts)
+                                save_timeline_events(behavior_events)
+                                save_log_lines(behavior_logs)
+                                return ids
+
+                            persisted_ids = await asyncio.to_thread(_flush_behaviors)
+                            for post, persisted_id in zip(behavior_posts, persisted_ids):
+                                post.id = persisted_id
+                            _bump_feed_version()
+                            if has_listeners:
+                                await ws_manager.emit_posts_created_bulk(
+                                    [post.to_dict() for post in behavior_posts])
+                                await ws_manager.emit_events_created_bulk(
+                                    [event.to_dict() for event in behavior_events])
+                                await ws_manager.emit_logs_added_bulk(
+                                    [log.to_dict() for log in behavior_logs])
+
+                        # Sync LLM runtime call logs to both log stream and feed.
+                        llm_logs: list[LogLine] = []
+                        llm_feeds: list[FeedPost] = []
+                        for call_log in llm_call_logs:
+                            log_level_raw = str(call_log.get("level", "info")).lower()
+                            if log_level_raw == "ok":
+                                log_level = LogLevel.OK
+                            elif log_level_raw == "error":
+                                log_level = LogLevel.ERROR
+                            else:
+                                log_level = LogLevel.INFO
 
+                            message = str(call_log.get("message", ""))
+                            llm_logs.append(LogLine(
+                                id=_mkid(),
+                                tick=_sim_state.tick,
+                                level=log_level,
+                                text=f"[LLM] {message}",
+                                agent_id=None,
+                            ))
+                            llm_feeds.append(FeedPost(
+                                id=_mkid(),
+                                tick=_sim_state.tick,
+                                author_id=0,
+                                author_name="LLM Engine",
+                                emotion=0.0,
+                                content=f"[LLM][{log_level_raw}] {message}",
+                                likes=0,
+                            ))
+                            logger.info("[LLM] %s", message)
+
+                        if llm_logs:
+                            def _flush_llm() -> list[str]:
+                                save_log_lines(llm_logs)
+                                return save_feed_posts(llm_feeds)
+
+                            persisted_ids = await asyncio.to_thread(_flush_llm)
+                            for feed, persisted_id in zip(llm_feeds, persisted_ids):
+                                feed.id = persisted_id
+                            _bump_feed_version()
+                            if has_listeners:
+                                await ws_manager.emit_logs_added_bulk(
+                                    [log.to_dict() for log in llm_logs])
+                                await ws_manager.emit_posts_created_bulk(
+                                    [feed.to_dict() for feed in llm_feeds])
+                        # Also sync actual posts to feed database
+                        try:
+                            new_posts = await get_simulation_posts(limit=20)
+                            logger.info("[Ticker] Fetched %d posts from OASIS", len(new_posts))
+
+                            # 去重查询 + 逐条写库 + 日志落库整体搬进
+                            # 工作线程；事件循环只负责最终的 WS 广播
+                            def _sync_posts() -> tuple[list[dict], list[LogLine]]:
+                                # 先把整个 tick 的帖子攒成批，再用
+                                # save_oasis_feed_posts 一个事务写入：
+                                # 去重一次 IN 查询、一次提交，而不是逐条往返
+                                batch: list[tuple[int, FeedPost]] = []
                                 for post_data in new_posts:
-                                    # Create FeedPost from OASIS post data
-                                    feed_post = FeedPost(
+                                    batch.append((int(post_data["id"]), FeedPost(
                                         id=f"oasis_{post_data['id']}",  # Use prefixed ID for reference
                                         tick=_sim_state.tick,
                                         author_id=post_data["authorId"],
@@ -784,164 +1242,165 @@ async def simulation_ticker():
                                         emotion=post_data.get("emotion", 0.0),
                                         content=post_data.get("content", ""),
                                         likes=post_data.get("likes", 0),
-                                    )
-                                    # save_oasis_feed_post handles ID mapping internally
-                                    saved = save_oasis_feed_post(int(post_data["id"]), feed_post)
-                                    if saved:
-                                        await ws_manager.emit_post_created(feed_post.to_dict())
-                                        sync_log = LogLine(
-                                            id=str(uuid.uuid4()),
+                                    )))
+                                newly_synced = save_oasis_feed_posts(batch)
+
+                                synced: list[dict] = []
+                                logs: list[LogLine] = []
+                                for oasis_id, feed_post in batch:
+                                    if oasis_id in newly_synced:
+                                        synced.append(feed_post.to_dict())
+                                        logs.append(LogLine(
+                                            id=_mkid(),
                                             tick=_sim_state.tick,
                                             level=LogLevel.INFO,
-                                            text=f"[Ticker] Synced OASIS post {post_data['id']} to feed",
+                                            text=f"[Ticker] Synced OASIS post {oasis_id} to feed",
                                             agent_id=feed_post.author_id,
-                                        )
-                                        save_log_line(sync_log)
-                                        await ws_manager.emit_log_added(sync_log.to_dict())
-                                        print(f"[Ticker] Synced OASIS post {post_data['id']} to feed")
+                                        ))
+                                        logger.info("[Ticker] Synced OASIS post %s to feed", oasis_id)
                                     else:
-                                        skip_log = LogLine(
-                                            id=str(uuid.uuid4()),
+                                        logs.append(LogLine(
+                                            id=_mkid(),
                                             tick=_sim_state.tick,
                                             level=LogLevel.INFO,
-                                            text=f"[Ticker] OASIS post {post_data['id']} already synced, skipping",
+                                            text=f"[Ticker] OASIS post {oasis_id} already synced, skipping",
                                             agent_id=feed_post.author_id,
-                                        )
-                                        save_log_line(skip_log)
-                                        await ws_manager.emit_log_added(skip_log.to_dict())
-                                        print(f"[Ticker] OASIS post {post_data['id']} already synced, skipping")
-                            except Exception as e:
-                                sync_err_log = LogLine(
-                                    id=str(uuid.uuid4()),
-                                    tick=_sim_state.tick,
-                                    level=LogLevel.ERROR,
-                                    text=f"[Ticker] Failed to sync OASIS posts: {e}",
-                                    agent_id=None,
-                                )
-                                save_log_line(sync_err_log)
-                                await ws_manager.emit_log_added(sync_err_log.to_dict())
-                                print(f"[Ticker] Failed to sync OASIS posts: {e}")
-                                import traceback
-                                traceback.print_exc()
-                    else:
-                        # Fallback: simple ticker
-                        _sim_state.tick += 1
-
-                        # Update some agents (simulate behavior)
-                        import random
-                        agents_list = list(_sim_state.agents.keys())
-                        num_to_update = max(5, len(agents_list) // 10)
-
-                        # Randomly create posts (about 10% chance per tick when agents are active)
-                        if agents_list and random.random() < 0.3:
-                            agent_id = random.choice(agents_list)
-                            agent = _sim_state.agents[agent_id]
-                            agent_profile = agent.get("profile", {})
-                            agent_state = agent.get("state", {})
-
-                            # Generate post content based on agent mood
-                            mood = agent_state.get("mood", 0)
-                            last_action = agent_state.get("lastAction", "idle")
-
-                            # Post templates based on mood
-                            if mood > 0.5:
-                                templates = [
-                                    "Great things are happening today! #positive",
-                                    "Feeling optimistic! Looking forward to what's coming.",
-                                    "Making progress on my goals. Every step counts!",
-                                ]
-                            elif mood < -0.5:
-                                templates = [
-                                    "This is frustrating. Why can't things be better?",
-                                    "Disappointed with the current situation.",
-                                    "Need to speak up about what matters.",
-                                ]
-                            else:
-                                templates = [
-                                    "Just observing the conversation.",
-                                    "Taking time to process everything.",
-                                    "Thinking about the next steps.",
-                                ]
-
-                            # Add domain-specific posts if agent has expertise
-                            expertise = agent_profile.get("identity", {}).get("domain_of_expertise", [])
-                            if expertise and random.random() < 0.3:
-                                templates.append(f"Thoughts on {expertise[0]} today...")
-
-                            content = random.choice(templates)
-
-                            # Calculate emotion from mood
-                            emotion = max(-1.0, min(1.0, mood))
-
-                            # Save post to database
-                            try:
-                                from models import save_feed_post, FeedPost
-                                import uuid
-                                post = FeedPost(
-                                    id=str(uuid.uuid4()),
-                                    tick=_sim_state.tick,  # Use simulation tick
-                                    author_id=agent_id,
-                                    author_name=agent_profile.get("identity", {}).get("username", f"Agent_{agent_id}"),
-                                    emotion=emotion,
-                                    content=content,
-                                    likes=0,
-                                )
-                                persisted_id = save_feed_post(post)
-                                post.id = persisted_id
-
-                                # Update agent's last action
-                                _sim_state.agents[agent_id]["state"]["lastAction"] = "post"
-                                print(f"[Ticker] New post by Agent_{agent_id}: {content[:40]}...")
-
-                            except Exception as e:
-                                print(f"[Ticker] Failed to save post: {e}")
-
-                        # Update agent states
-                        for _ in range(num_to_update):
-                            if not agents_list:
-                                break
-                            agent_id = random.choice(agents_list)
-                            if agent_id in _sim_state.agents:
-                                # Simulate mood change
-                                current_mood = _sim_state.agents[agent_id]["state"]["mood"]
-                                stimulus = random.uniform(-0.3, 0.3)
-
-                                # Get agent profile from database to get personality
-                                try:
-                                    from models import get_agent_by_id
-                                    agent = get_agent_by_id(agent_id)
-                                    openness = agent.psychometrics.big_five.O
-                                    neuroticism = agent.psychometrics.big_five.N
-                                except:
-                                    openness =  0.5
-                                    neuroticism = 0.5
-
-                                new_mood = simulate_mood_change(
-                                    current_mood,
-                                    stimulus,
-                                    openness=openness,
-                                    neuroticism=neuroticism,
-                                )
-                                _sim_state.agents[agent_id]["state"]["mood"] = new_mood
-                                _sim_state.agents[agent_id]["state"]["lastAction"] = (
-                                    "celebrate" if new_mood > 0.3 else "complain" if new_mood < -0.3 else "observe"
-                                )
-
-                    # Save state
-                    save_simulation_state(_sim_state)
-
-                    # Emit tick update
-                    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
-
-            await asyncio.sleep(1.0 / (_sim_state.config.ticks_per_second * _sim_state.speed))
+                                        ))
+                                        logger.info("[Ticker] OASIS post %s already synced, skipping", oasis_id)
+                                if logs:
+                                    save_log_lines(logs)
+                                return synced, logs
+
+                            synced_posts, sync_logs = await asyncio.to_thread(_sync_posts)
+                            if synced_posts:
+                                _bump_feed_version()
+
+                            if sync_logs and has_listeners:
+                                await ws_manager.emit_posts_created_bulk(synced_posts)
+                                await ws_manager.emit_logs_added_bulk(
+                                    [log.to_dict() for log in sync_logs])
+                        except Exception as e:
+                            sync_err_log = LogLine(
+                                id=_mkid(),
+                                tick=_sim_state.tick,
+                                level=LogLevel.ERROR,
+                                text=f"[Ticker] Failed to sync OASIS posts: {e}",
+                                agent_id=None,
+                            )
+                            await asyncio.to_thread(save_log_line, sync_err_log)
+                            await ws_manager.emit_log_added(sync_err_log.to_dict())
+                            logger.exception("[Ticker] Failed to sync OASIS posts")
+                else:
+                    # Fallback: simple ticker
+                    _sim_state.tick += 1
+
+                    # Update some agents (simulate behavior)
+                    agents_list = _agent_arrays.ids
+                    num_to_update = max(5, len(agents_list) // 10)
+
+                    # 本 tick 发帖分支所需的标量随机数一次批量抽取
+                    # （单次 RNG 调用，代替逐个 random.* 调用）。
+                    # 随机帖是纯展示性内容：没有 WS 观众时整条分支跳过。
+                    if agents_list and has_listeners:
+                        post_roll, pick_roll, expertise_roll, template_roll = np.random.random(4)
+
+                    # Randomly create posts (about 10% chance per tick when agents are active)
+                    if agents_list and has_listeners and post_roll < 0.3:
+                        agent_id = agents_list[int(pick_roll * len(agents_list))]
+                        agent = _sim_state.agents.get(agent_id) or {}
+                        agent_profile = agent.get("profile", {})
+                        agent_idx = _agent_arrays.id_to_idx[agent_id]
+
+                        # Generate post content based on agent mood
+                        mood = _agent_arrays.mood_value(agent_idx)
+
+                        # Post templates based on mood (frozen at module load)
+                        if mood > 0.5:
+                            templates = _POST_TEMPLATES_POSITIVE
+                        elif mood < -0.5:
+                            templates = _POST_TEMPLATES_NEGATIVE
+                        else:
+                            templates = _POST_TEMPLATES_NEUTRAL
+
+                        # Add domain-specific posts if agent has expertise
+                        # （初始化时渲染，持久化旧状态缺键时回退到模板）
+                        expertise_post = agent.get("expertise_post", "")
+                        if expertise_post and expertise_roll < 0.3:
+                            content = expertise_post
+                        else:
+                            content = templates[int(template_roll * len(templates))]
+
+                        # Calculate emotion from mood
+                        emotion = max(-1.0, min(1.0, mood))
+
+                        # Save post to database
+                        try:
+                            post = FeedPost(
+                                id=_mkid(),
+                                tick=_sim_state.tick,  # Use simulation tick
+                                author_id=agent_id,
+                                author_name=agent_profile.get("identity", {}).get("username", f"Agent_{agent_id}"),
+                                emotion=emotion,
+                                content=content,
+                                likes=0,
+                            )
+                            persisted_id = await asyncio.to_thread(save_feed_post, post)
+                            post.id = persisted_id
+                            _bump_feed_version()
+
+                            # Update agent's last action
+                            _agent_arrays.set_fields(agent_id, last_action="post")
+                            logger.info("[Ticker] New post by Agent_%s: %.40s...", agent_id, content)
+
+                        except Exception as e:
+                            logger.exception("[Ticker] Failed to save post")
+
+                    # Update agent states：一次抽样 + 一次批量 mood 更新，
+                    # 人格特质直接从 SoA 数组切片，循环整体下沉到 C 层
+                    n_agents = len(agents_list)
+                    if n_agents:
+                        sel = np.random.choice(
+                            n_agents, size=min(num_to_update, n_agents), replace=False)
+                        stimuli = np.random.uniform(-0.3, 0.3, size=sel.size)
+                        current_moods = (
+                            _agent_arrays.mood[sel].astype(np.float64)
+                            / AgentStateArrays.MOOD_SCALE
+                        )
+                        new_moods = simulate_mood_change_batch(
+                            current_moods,
+                            stimuli,
+                            _agent_arrays.openness[sel],
+                            _agent_arrays.neuroticism[sel],
+                        )
+                        _agent_arrays.mood[sel] = np.rint(
+                            np.clip(new_moods, -1.0, 1.0) * AgentStateArrays.MOOD_SCALE
+                        ).astype(np.int8)
+                        _agent_arrays.last_action[sel] = np.where(
+                            new_moods > 0.3, "celebrate",
+                            np.where(new_moods < -0.3, "complain", "observe"))
+
+                # Save state（按 tick 合并，见 _persist_sim_state_coalesced）
+                _persist_sim_state_coalesced(_sim_state)
+
+                # Emit tick update
+                await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+
+            # 干预直接在 API 处理器里同步应用；tick 体内没有 await 打断
+            # 它们的原子性，单写者由事件循环本身保证，无需 ticker 锁。
+            next_tick += _tick_interval(_sim_state)
+            delay = next_tick - loop.time()
+            if delay <= 0:
+                # 已经落后：重置基准而不是连发补偿 tick
+                next_tick = loop.time()
+                delay = 0.0
+            await asyncio.sleep(delay)
 
         except asyncio.CancelledError:
             break
         except Exception as e:
-            print(f"Error in simulation ticker: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in simulation ticker")
             await asyncio.sleep(1.0)
+            next_tick = loop.time()
 
 
 # ============= API Routes =============
@@ -964,7 +1423,31 @@ async def health():
 
 # ============= Agent Endpoints =============
 
-@app.get("/api/agents", response_model=List[AgentResponse])
+# /api/agents 是只读热路径且 profile 运行期不变：响应字典按 agent id
+# 缓存一次，后续请求直接复用并经默认 ORJSONResponse 序列化，
+# 整条路径不再经过 Pydantic 校验/模型构造
+_agent_response_cache: dict[int, dict] = {}
+
+
+def _agent_response_dict(agent: AgentProfile) -> dict:
+    """构建（或复用缓存的）单个代理的响应字典。"""
+    cached = _agent_response_cache.get(agent.id)
+    if cached is None:
+        cached = {
+            "id": agent.id,
+            "name": agent.name,
+            "group": agent.group,
+            "identity": agent.identity.to_dict(),
+            "psychometrics": agent.psychometrics.to_dict(),
+            "social_status": agent.social_status.to_dict(),
+            "behavior_profile": agent.behavior_profile.to_dict(),
+            "cognitive_state": agent.cognitive_state.to_dict(),
+        }
+        _agent_response_cache[agent.id] = cached
+    return cached
+
+
+@app.get("/api/agents")
 async def get_agents(
     ids: Optional[str] = Query(None, description="Comma-separated list of agent IDs"),
     limit: Optional[int] = Query(None, description="Maximum number of agents to return"),
@@ -980,48 +1463,39 @@ async def get_agents(
     """
     if ids:
         agent_ids = [int(id.strip()) for id in ids.split(",") if id.strip().isdigit()]
-        agents = get_agents_by_ids(agent_ids)
+        agents = await asyncio.to_thread(get_agents_by_ids, agent_ids)
+        # Apply pagination
+        if offset:
+            agents = agents[offset:]
+        if limit:
+            agents = agents[:limit]
     else:
-        agents = get_all_agents()
+        # 流式读取 + islice 分页：带 limit 时不物化整表
+        def _page() -> list:
+            it = iter_all_agents()
+            try:
+                stop = offset + limit if limit else None
+                return list(itertools.islice(it, offset, stop))
+            finally:
+                it.close()
 
-    # Apply pagination
-    if offset:
-        agents = agents[offset:]
-    if limit:
-        agents = agents[:limit]
+        agents = await asyncio.to_thread(_page)
 
-    return [
-        AgentResponse(
-            id=agent.id,
-            name=agent.name,
-            group=agent.group,
-            identity=agent.identity.to_dict(),
-            psychometrics=agent.psychometrics.to_dict(),
-            social_status=agent.social_status.to_dict(),
-            behavior_profile=agent.behavior_profile.to_dict(),
-            cognitive_state=agent.cognitive_state.to_dict(),
-        )
-        for agent in agents
-    ]
+    return [_agent_response_dict(agent) for agent in agents]
 
 
-@app.get("/api/agents/{agent_id}", response_model=AgentResponse)
+@app.get("/api/agents/{agent_id}")
 async def get_agent(agent_id: int):
     """Get a single agent by ID."""
-    agent = get_agent_by_id(agent_id)
+    cached = _agent_response_cache.get(agent_id)
+    if cached is not None:
+        return cached
+
+    agent = await asyncio.to_thread(get_agent_by_id, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
 
-    return AgentResponse(
-        id=agent.id,
-        name=agent.name,
-        group=agent.group,
-        identity=agent.identity.to_dict(),
-        psychometrics=agent.psychometrics.to_dict(),
-        social_status=agent.social_status.to_dict(),
-        behavior_profile=agent.behavior_profile.to_dict(),
-        cognitive_state=agent.cognitive_state.to_dict(),
-    )
+    return _agent_response_dict(agent)
 
 
 @app.get("/api/agents/{agent_id}/state")
@@ -1035,17 +1509,15 @@ async def get_agent_state(agent_id: int):
             return default
 
     def _fallback_state() -> dict[str, Any]:
-        state = _sim_state
-        agent_data = state.agents.get(agent_id) or state.agents.get(str(agent_id))
-        if not agent_data:
+        agent_state = _agent_arrays.get_state(agent_id)
+        if agent_state is None:
             raise HTTPException(status_code=404, detail=f"Agent {agent_id} state not found")
 
-        agent_state = agent_data.get("state", {})
         return {
-            "mood": _safe_num(agent_state.get("mood", 0.0), 0.0),
-            "stance": _safe_num(agent_state.get("stance", 0.0), 0.0),
-            "resources": _safe_num(agent_state.get("resources", 0.5), 0.5),
-            "lastAction": str(agent_state.get("lastAction", "")),
+            "mood": _safe_num(agent_state["mood"], 0.0),
+            "stance": _safe_num(agent_state["stance"], 0.0),
+            "resources": _safe_num(agent_state["resources"], 0.5),
+            "lastAction": agent_state["lastAction"],
             "evidence": {
                 "memoryHits": [],
                 "reasoningSummary": "fallback state (OASIS unavailable or invalid)",
@@ -1059,14 +1531,12 @@ async def get_agent_state(agent_id: int):
             oasis_state = await get_simulation_agent_state(agent_id)
             if oasis_state and "evidence" in oasis_state:
                 # Merge with in-memory state for stable values.
-                state = _sim_state
-                agent_data = state.agents.get(agent_id) or state.agents.get(str(agent_id))
-                if agent_data:
-                    agent_state = agent_data.get("state", {})
-                    oasis_state["mood"] = _safe_num(agent_state.get("mood", oasis_state.get("mood", 0.0)), 0.0)
-                    oasis_state["stance"] = _safe_num(agent_state.get("stance", oasis_state.get("stance", 0.0)), 0.0)
-                    oasis_state["resources"] = _safe_num(agent_state.get("resources", oasis_state.get("resources", 0.5)), 0.5)
-                    oasis_state["lastAction"] = str(agent_state.get("lastAction", oasis_state.get("lastAction", "")))
+                agent_state = _agent_arrays.get_state(agent_id)
+                if agent_state is not None:
+                    oasis_state["mood"] = _safe_num(agent_state["mood"], 0.0)
+                    oasis_state["stance"] = _safe_num(agent_state["stance"], 0.0)
+                    oasis_state["resources"] = _safe_num(agent_state["resources"], 0.5)
+                    oasis_state["lastAction"] = agent_state["lastAction"]
                 else:
                     oasis_state["mood"] = _safe_num(oasis_state.get("mood", 0.0), 0.0)
                     oasis_state["stance"] = _safe_num(oasis_state.get("stance", 0.0), 0.0)
@@ -1082,91 +1552,110 @@ async def get_agent_state(agent_id: int):
                 }
                 return oasis_state
     except Exception as e:
-        print(f"[AgentState] OASIS state fetch failed for agent {agent_id}: {e}")
+        logger.warning("[AgentState] OASIS state fetch failed for agent %s: %s", agent_id, e)
 
     # Fall back to in-memory state if OASIS path fails or unavailable.
     return _fallback_state()
 
 
 @app.patch("/api/agents/{agent_id}/state")
-async def patch_agent_state(
-    agent_id: int,
-    mood: Optional[float] = Body(None),
-    stance: Optional[float] = Body(None),
-    resources: Optional[float] = Body(None),
-    lastAction: Optional[str] = Body(None),
-):
+async def patch_agent_state(agent_id: int, request: AgentStatePatchRequest):
     """Update an agent's state."""
-    global _sim_state
-    state = get_simulation_state()
-
-    agent_key: Any = None
-    if agent_id in state.agents:
-        agent_key = agent_id
-    elif str(agent_id) in state.agents:
-        agent_key = str(agent_id)
-
-    if agent_key is None:
+    updated = _agent_arrays.set_fields(
+        agent_id,
+        mood=request.mood,
+        stance=request.stance,
+        resources=request.resources,
+        last_action=request.lastAction,
+    )
+    if not updated:
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} state not found")
 
-    agent_state = state.agents[agent_key]["state"]
-    if mood is not None:
-        agent_state["mood"] = mood
-    if stance is not None:
-        agent_state["stance"] = stance
-    if resources is not None:
-        agent_state["resources"] = resources
-    if lastAction is not None:
-        agent_state["lastAction"] = lastAction
-
-    save_simulation_state(state)
-    _sim_state = state
+    _mark_state_dirty()
 
     # Emit update
-    await ws_manager.emit_agent_update(agent_id, agent_state)
+    await ws_manager.emit_agent_update(agent_id, _agent_arrays.get_state(agent_id))
 
     return {"status": "ok"}
 
 
 # ============= Groups Endpoints =============
 
+# 组画像在运行期没有任何变更端点，信息流前端却会反复轮询；
+# 短 TTL 进程内缓存即可省掉每次的 DB 读（单 worker 部署，无跨进程失效问题）
+_GROUPS_CACHE_TTL = 5.0
+_groups_cache: dict[str, Any] = {"payload": None, "expires": 0.0}
+
+
+# 组画像没有任何变更端点；若将来出现，写路径须自增此计数
+_groups_version = 0
+
+
 @app.get("/api/groups")
-async def get_groups():
-    """Get all group profiles."""
-    groups = get_all_group_profiles()
-    return {
+async def get_groups(request: Request, response: Response):
+    """Get all group profiles.（短 TTL 进程内缓存 + ETag 304）"""
+    etag = f'"groups-{_groups_version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    now = time.monotonic()
+    if _groups_cache["payload"] is not None and now < _groups_cache["expires"]:
+        return _groups_cache["payload"]
+
+    groups = await asyncio.to_thread(get_all_group_profiles)
+    payload = {
         "groups": [group.to_dict() for group in groups],
     }
+    _groups_cache["payload"] = payload
+    _groups_cache["expires"] = now + _GROUPS_CACHE_TTL
+    return payload
 
 
 # ============= Feed Endpoints =============
 
+# 任何写入帖子表的路径（REST 或 ticker 落库）都自增此计数；
+# /api/feed 的 ETag 由它与查询参数共同构成
+_feed_version = 0
+
+
+def _bump_feed_version() -> None:
+    global _feed_version
+    _feed_version += 1
+
+
 @app.get("/api/feed", response_model=List[FeedPostResponse])
 async def get_feed(
+    request: Request,
+    response: Response,
     limit: int = Query(50, description="Maximum number of posts to return"),
     offset: int = Query(0, description="Number of posts to skip"),
     sort: str = Query("time", description="Sort order: time, emotion, likes"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from X-Next-Cursor"),
 ):
     """
     Get feed posts.
 
     Query parameters:
     - limit: Maximum number of posts to return
-    - offset: Number of posts to skip
+    - offset: Number of posts to skip (prefer cursor for deep pagination)
     - sort: Sort order (time, emotion, likes)
-    """
-    posts = get_feed_posts(limit=limit * 2, offset=offset)  # Get more for sorting
+    - cursor: keyset 游标（上一响应的 X-Next-Cursor 头），避免大 OFFSET 扫描
 
-    if sort == "emotion":
-        posts.sort(key=lambda p: abs(p.emotion), reverse=True)
-    elif sort == "likes":
-        posts.sort(key=lambda p: p.likes, reverse=True)
-    # else: time (default, already sorted by created_at DESC)
+    下一页游标经 X-Next-Cursor 响应头返回，响应体保持为数组不变。
+    """
+    etag = f'W/"feed-{_feed_version}-{sort}-{limit}-{offset}-{cursor or ""}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
 
-    posts = posts[:limit]
+    # Sorting and truncation happen in SQL; no over-fetch needed.
+    posts, next_cursor = await asyncio.to_thread(get_feed_posts, limit, offset, sort, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
-        FeedPostResponse(
+        FeedPostResponse.model_construct(
             id=post.id,
             tick=post.tick,
             authorId=post.author_id,
@@ -1180,24 +1669,22 @@ async def get_feed(
 
 
 @app.post("/api/feed")
-async def create_post(
-    agent_id: int = Body(..., embed=True),
-    content: str = Body(..., embed=True),
-    emotion: Optional[float] = Body(None, embed=True),
-):
+async def create_post(request: CreatePostRequest):
     """Create a new post."""
-    from models import get_agent_by_id
-    agent = get_agent_by_id(agent_id)
+    agent_id = request.agent_id
+    content = request.content
+    agent = await asyncio.to_thread(get_agent_by_id, agent_id)
     author_name = agent.name if agent else f"Agent_{agent_id}"
 
     # Calculate emotion if not provided
+    emotion = request.emotion
     if emotion is None:
         emotion = get_emotion_from_content(content, fallback=0.0)
 
-    state = get_simulation_state()
+    state = await asyncio.to_thread(get_simulation_state)
 
     post = FeedPost(
-        id=str(uuid.uuid4()),
+        id=_mkid(),
         tick=state.tick,
         author_id=agent_id,
         author_name=author_name,
@@ -1206,31 +1693,47 @@ async def create_post(
         likes=0,
     )
 
-    persisted_id = save_feed_post(post)
+    persisted_id = await asyncio.to_thread(save_feed_post, post)
     post.id = persisted_id
+    _bump_feed_version()
+    _invalidate_state_cache()
 
     # Emit post creation
     await ws_manager.emit_post_created(post.to_dict())
 
-    return FeedPostResponse(**post.to_dict())
+    return FeedPostResponse.model_construct(**post.to_dict())
 
 
 # ============= State Endpoints =============
 
 @app.get("/api/state", response_model=SimulationStateResponse)
-async def get_state():
+async def get_state(request: Request, response: Response):
     """Get the current simulation state."""
+    now = time.monotonic()
+    etag = f'W/"state-{_sim_state.tick}-{_state_version}"'
+
+    # ETag 快路径：客户端已有当前版本时返回 304。
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # 短 TTL 进程内缓存：同一版本内避免重复序列化全部状态。
+    if _state_cache["payload"] is not None and _state_cache["etag"] == etag and now < _state_cache["expires"]:
+        response.headers["ETag"] = etag
+        return _state_cache["payload"]
+
     # Use global in-memory state for real-time updates
     state = _sim_state
+    # Materialize the SoA agent state into the dict form at the API boundary.
+    _agent_arrays.sync_to_state(state)
 
     # Ensure groups are populated
     if not state.groups:
-        groups = get_all_group_profiles()
+        groups = await asyncio.to_thread(get_all_group_profiles)
         state.groups = {g.key: g.to_dict() for g in groups}
 
-    intervention_records = get_all_interventions()[:120]
+    intervention_records = (await asyncio.to_thread(get_interventions, 120))[0]
 
-    return SimulationStateResponse(
+    payload = SimulationStateResponse(
         config=state.config.to_dict(),
         tick=state.tick,
         isRunning=state.is_running,
@@ -1246,18 +1749,23 @@ async def get_state():
         currentSnapshotId=state.current_snapshot_id,
     )
 
+    _state_cache["payload"] = payload
+    _state_cache["etag"] = etag
+    _state_cache["expires"] = now + _STATE_CACHE_TTL
+    response.headers["ETag"] = etag
+    return payload
+
 
 @app.patch("/api/state")
-async def patch_state(
-    isRunning: Optional[bool] = Body(None),
-    speed: Optional[float] = Body(None),
-    tick: Optional[int] = Body(None),
-    selectedAgentId: Optional[int] = Body(None),
-    config: Optional[dict] = Body(None),
-):
+async def patch_state(request: StatePatchRequest):
     """Update simulation state."""
     global _sim_state
     state = _sim_state if _sim_state is not None else get_simulation_state()
+    isRunning = request.isRunning
+    speed = request.speed
+    tick = request.tick
+    selectedAgentId = request.selectedAgentId
+    config = request.config
 
     if isRunning is not None:
         state.is_running = isRunning
@@ -1292,8 +1800,8 @@ async def patch_state(
             await update_simulation_config(state.config.to_dict())
         sys_ok("State patch: config updated", category="simulation")
 
-    save_simulation_state(state)
     _sim_state = state
+    _mark_state_dirty()
 
     # Emit state update
     await ws_manager.emit_tick_update(state.tick, state.is_running, state.speed)
@@ -1305,20 +1813,30 @@ async def patch_state(
 
 # ============= Simulation Control Endpoints =============
 
+async def _apply_control_change(**columns) -> None:
+    """仿真控制端点共享的收尾逻辑。
+
+    内存中的 _sim_state 是运行期权威数据，控制端点只翻转单个
+    布尔/浮点值；这里按列定向 UPDATE 落库，而不是整行
+    get→改→save 往返（那会把全量 agents_json 重新序列化回写）。
+    """
+    global _loaded_snapshot_hash
+    await asyncio.to_thread(update_simulation_control, **columns)
+    _invalidate_state_cache()
+    # 控制列偏离后，当前状态不再等同于最近加载的快照
+    _loaded_snapshot_hash = None
+    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+
+
 @app.post("/api/simulation/start")
 async def start_simulation(request: Optional[SimulationControlRequest] = None):
     """Start the simulation."""
-    global _sim_state
-    # Sync from database first
-    _sim_state = get_simulation_state()
     _sim_state.is_running = True
 
     if request and request.speed:
         _sim_state.speed = max(0.1, min(10.0, request.speed))
 
-    save_simulation_state(_sim_state)
-
-    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+    await _apply_control_change(is_running=True, speed=_sim_state.speed)
     sys_ok(f"Simulation started at tick={_sim_state.tick}, speed={_sim_state.speed}", category="simulation")
 
     return {"status": "started", "tick": _sim_state.tick}
@@ -1327,12 +1845,8 @@ async def start_simulation(request: Optional[SimulationControlRequest] = None):
 @app.post("/api/simulation/stop")
 async def stop_simulation():
     """Stop the simulation."""
-    global _sim_state
-    _sim_state = get_simulation_state()
     _sim_state.is_running = False
-    save_simulation_state(_sim_state)
-
-    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+    await _apply_control_change(is_running=False)
     sys_warn(f"Simulation stopped at tick={_sim_state.tick}", category="simulation")
 
     return {"status": "stopped", "tick": _sim_state.tick}
@@ -1341,12 +1855,8 @@ async def stop_simulation():
 @app.post("/api/simulation/pause")
 async def pause_simulation():
     """Pause the simulation."""
-    global _sim_state
-    _sim_state = get_simulation_state()
     _sim_state.is_running = False
-    save_simulation_state(_sim_state)
-
-    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+    await _apply_control_change(is_running=False)
     sys_info(f"Simulation paused at tick={_sim_state.tick}", category="simulation")
 
     return {"status": "paused", "tick": _sim_state.tick}
@@ -1355,40 +1865,28 @@ async def pause_simulation():
 @app.post("/api/simulation/resume")
 async def resume_simulation():
     """Resume the simulation."""
-    global _sim_state
-    _sim_state = get_simulation_state()
     _sim_state.is_running = True
-    save_simulation_state(_sim_state)
-
-    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+    await _apply_control_change(is_running=True)
     sys_ok(f"Simulation resumed at tick={_sim_state.tick}", category="simulation")
 
     return {"status": "resumed", "tick": _sim_state.tick}
 
 
 @app.put("/api/simulation/speed")
-async def set_simulation_speed(speed: float = Body(..., embed=True)):
+async def set_simulation_speed(request: SpeedRequest):
     """Set the simulation speed."""
-    global _sim_state
-    _sim_state = get_simulation_state()
-    _sim_state.speed = max(0.1, min(10.0, speed))
-    save_simulation_state(_sim_state)
-
-    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+    _sim_state.speed = max(0.1, min(10.0, request.speed))
+    await _apply_control_change(speed=_sim_state.speed)
     sys_info(f"Simulation speed set to {_sim_state.speed}", category="simulation")
 
     return {"status": "ok", "speed": _sim_state.speed}
 
 
 @app.post("/api/simulation/tick")
-async def set_simulation_tick(tick: int = Body(..., embed=True)):
+async def set_simulation_tick(request: TickRequest):
     """Set the current tick."""
-    global _sim_state
-    _sim_state = get_simulation_state()
-    _sim_state.tick = max(0, tick)
-    save_simulation_state(_sim_state)
-
-    await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
+    _sim_state.tick = max(0, request.tick)
+    await _apply_control_change(tick=_sim_state.tick)
     sys_info(f"Simulation tick set to {_sim_state.tick}", category="simulation")
 
     return {"status": "ok", "tick": _sim_state.tick}
@@ -1422,14 +1920,18 @@ async def get_simulation_runtime_metrics():
 
 @app.get("/api/events", response_model=List[TimelineEventResponse])
 async def get_events(
+    response: Response,
     limit: int = Query(100, description="Maximum number of events to return"),
     offset: int = Query(0, description="Number of events to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from X-Next-Cursor"),
 ):
-    """Get timeline events."""
-    events = get_timeline_events(limit=limit, offset=offset)
+    """Get timeline events.（下一页游标经 X-Next-Cursor 响应头返回）"""
+    events, next_cursor = await asyncio.to_thread(get_timeline_events, limit, offset, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
-        TimelineEventResponse(
+        TimelineEventResponse.model_construct(
             id=event.id,
             tick=event.tick,
             type=event.type.value,
@@ -1442,28 +1944,23 @@ async def get_events(
 
 
 @app.post("/api/events")
-async def create_event(
-    tick: int = Body(...),
-    type: str = Body(...),
-    title: str = Body(...),
-    agentId: Optional[int] = Body(None),
-    payload: Optional[dict] = Body(None),
-):
+async def create_event(request: CreateEventRequest):
     """Create a timeline event."""
     event = TimelineEvent(
-        id=str(uuid.uuid4()),
-        tick=tick,
-        type=EventType(type),
-        title=title,
-        agent_id=agentId,
-        payload=payload,
+        id=_mkid(),
+        tick=request.tick,
+        type=request.type,
+        title=request.title,
+        agent_id=request.agentId,
+        payload=request.payload,
     )
 
-    save_timeline_event(event)
+    await asyncio.to_thread(save_timeline_event, event)
+    _invalidate_state_cache()
 
     await ws_manager.emit_event_created(event.to_dict())
 
-    return TimelineEventResponse(
+    return TimelineEventResponse.model_construct(
         id=event.id,
         tick=event.tick,
         type=event.type.value,
@@ -1477,21 +1974,19 @@ async def create_event(
 
 @app.get("/api/logs", response_model=List[LogLineResponse])
 async def get_logs(
+    response: Response,
     limit: int = Query(100, description="Maximum number of logs to return"),
     offset: int = Query(0, description="Number of logs to skip"),
     level: Optional[str] = Query(None, description="Filter by log level"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from X-Next-Cursor"),
 ):
-    """Get simulation logs."""
-    logs = get_log_lines(limit=limit)
-    # Apply offset by slicing (since get_log_lines doesn't support offset parameter)
-    if offset > 0:
-        logs = logs[offset:]
-
-    if level:
-        logs = [log for log in logs if log.level.value == level]
+    """Get simulation logs.（级别过滤与分页在 SQL 完成；下一页游标经 X-Next-Cursor 响应头返回）"""
+    logs, next_cursor = await asyncio.to_thread(get_log_lines, limit, cursor, level, offset)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
-        LogLineResponse(
+        LogLineResponse.model_construct(
             id=log.id,
             tick=log.tick,
             agentId=log.agent_id,
@@ -1503,26 +1998,22 @@ async def get_logs(
 
 
 @app.post("/api/logs")
-async def create_log(
-    tick: int = Body(...),
-    level: str = Body(...),
-    text: str = Body(...),
-    agentId: Optional[int] = Body(None),
-):
+async def create_log(request: CreateLogRequest):
     """Create a log entry."""
     log = LogLine(
-        id=str(uuid.uuid4()),
-        tick=tick,
-        level=LogLevel(level),
-        text=text,
-        agent_id=agentId,
+        id=_mkid(),
+        tick=request.tick,
+        level=request.level,
+        text=request.text,
+        agent_id=request.agentId,
     )
 
-    save_log_line(log)
+    await asyncio.to_thread(save_log_line, log)
+    _invalidate_state_cache()
 
     await ws_manager.emit_log_added(log.to_dict())
 
-    return LogLineResponse(
+    return LogLineResponse.model_construct(
         id=log.id,
         tick=log.tick,
         agentId=log.agent_id,
@@ -1545,11 +2036,27 @@ async def get_system_logs(
 
 # ============= Snapshots Endpoints =============
 
+# 快照一旦写入便不可变：单个快照可用以 ID 为键的强 ETag，
+# 列表 ETag 只在创建/删除时失效。
+_snapshots_version = 0
+_SNAPSHOT_KEEP = 50
+
+
+def _bump_snapshots_version() -> None:
+    global _snapshots_version
+    _snapshots_version += 1
+
+
 @app.get("/api/snapshots")
-async def get_snapshots():
+async def get_snapshots(request: Request, response: Response):
     """Get all simulation snapshots."""
-    snapshots = get_all_snapshots()
+    etag = f'"snapshots-{_snapshots_version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    snapshots = await asyncio.to_thread(get_all_snapshots)
 
+    response.headers["ETag"] = etag
     return [
         {
             "id": snapshot.id,
@@ -1566,9 +2073,25 @@ async def get_snapshots():
 @app.post("/api/snapshots")
 async def create_snapshot(request: SnapshotRequest):
     """Create a simulation snapshot."""
-    state = get_simulation_state()
-
-    snapshot = create_snapshot(request.name, state)
+    def _snapshot():
+        # 快照前先把内存权威状态（含 SoA 视图）刷盘，记录的才是
+        # 实时 tick/代理状态，而不是最多落后 _SAVE_EVERY_TICKS 个
+        # tick 的数据库副本；序列化 + 压缩也一并留在工作线程
+        _persist_sim_state(_sim_state)
+        return create_snapshot_record(request.name, _sim_state)
+
+    snapshot = await asyncio.to_thread(_snapshot)
+    _bump_snapshots_version()
+
+    # 机会性修剪：只保留最近 _SNAPSHOT_KEEP 个快照，防止列表无界增长；
+    # 放到工作线程执行，不拖慢创建请求本身
+    async def _prune() -> None:
+        pruned = await asyncio.to_thread(prune_snapshots, _SNAPSHOT_KEEP)
+        if pruned:
+            _bump_snapshots_version()
+            _invalidate_state_cache()
+
+    asyncio.create_task(_prune())
 
     return {
         "id": snapshot.id,
@@ -1580,37 +2103,87 @@ async def create_snapshot(request: SnapshotRequest):
     }
 
 
+# 快照 data 可达数 MB；流式发送按该块大小切片，编码与套接字写入重叠
+_SNAPSHOT_CHUNK_SIZE = 64 * 1024
+
+
+def _encode_snapshot_chunks(raw: dict):
+    """逐块产出快照响应体：元数据信封 + 存储的 data JSON 原文。
+
+    data 已是解压后的 JSON 字节串，直接切片转发即可，
+    峰值内存从 O(快照) 降到 O(块)。
+    """
+    envelope = orjson.dumps({
+        "id": raw["id"],
+        "name": raw["name"],
+        "experimentName": raw["experiment_name"],
+        "createdAt": raw["created_at"],
+        "runNumber": raw["run_number"],
+        "finalTick": raw["final_tick"],
+    })
+    yield envelope[:-1] + b',"data":'
+
+    data = raw["data_json"]
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    for offset in range(0, len(data), _SNAPSHOT_CHUNK_SIZE):
+        yield data[offset:offset + _SNAPSHOT_CHUNK_SIZE]
+    yield b"}"
+
+
 @app.get("/api/snapshots/{snapshot_id}")
-async def get_snapshot(snapshot_id: str):
+async def get_snapshot(snapshot_id: str, request: Request):
     """Get a snapshot by ID."""
-    snapshot = get_snapshot_by_id(snapshot_id)
-    if not snapshot:
+    # 快照数据不可变，ID 即内容版本；但快照会被删除/自动修剪，
+    # 回 304 前先做廉价的存在性探测，行没了就照常走 404。
+    etag = f'"snapshot-{snapshot_id}"'
+    if request.headers.get("if-none-match") == etag:
+        if await asyncio.to_thread(snapshot_exists, snapshot_id):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    raw = await asyncio.to_thread(get_snapshot_raw, snapshot_id)
+    if not raw:
         raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found")
 
-    return {
-        "id": snapshot.id,
-        "name": snapshot.name,
-        "experimentName": snapshot.experiment_name,
-        "createdAt": snapshot.created_at,
-        "runNumber": snapshot.run_number,
-        "finalTick": snapshot.final_tick,
-        "data": snapshot.data,
-    }
+    return StreamingResponse(
+        _encode_snapshot_chunks(raw),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
 
 
 @app.post("/api/snapshots/{snapshot_id}/load")
 async def load_snapshot(snapshot_id: str):
     """Load a snapshot, restoring the simulation state."""
-    snapshot = get_snapshot_by_id(snapshot_id)
+    snapshot = await asyncio.to_thread(get_snapshot_by_id, snapshot_id)
     if not snapshot:
         raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found")
 
-    # Restore state
-    state = SimulationState.from_dict(snapshot.data)
-    save_simulation_state(state)
+    global _sim_state, _loaded_snapshot_hash
+    target_hash = _snapshot_data_hash(snapshot.data)
+    if target_hash == _loaded_snapshot_hash:
+        # 当前状态就是这个快照（自上次加载后未持久化过其它状态），
+        # 跳过 from_dict 重建与落库，只重播状态帧
+        await ws_manager.emit_simulation_state(_sim_state.to_dict())
+        return {
+            "status": "loaded",
+            "snapshotId": snapshot_id,
+            "tick": _sim_state.tick,
+        }
+
+    # Restore state：重建、落库与 to_dict 都是大状态量的 CPU 工作，
+    # 放到工作线程执行，恢复期间事件循环仍能服务其他请求
+    state = await asyncio.to_thread(SimulationState.from_dict, snapshot.data)
+    state.agents = _normalize_agent_keys(state.agents)
+    _sim_state = state
+    _agent_arrays.load(state.agents)
+    await asyncio.to_thread(save_simulation_state, state)
+    _loaded_snapshot_hash = target_hash
+    _invalidate_state_cache()
 
     # Emit state update
-    await ws_manager.emit_simulation_state(state.to_dict())
+    payload = await asyncio.to_thread(state.to_dict)
+    await ws_manager.emit_simulation_state(payload)
 
     return {
         "status": "loaded",
@@ -1622,34 +2195,45 @@ async def load_snapshot(snapshot_id: str):
 @app.delete("/api/snapshots/{snapshot_id}")
 async def delete_snapshot(snapshot_id: str):
     """Delete a snapshot."""
-    deleted = delete_snapshot_record(snapshot_id)
+    deleted = await asyncio.to_thread(delete_snapshot_record, snapshot_id)
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found")
+    _bump_snapshots_version()
+    _invalidate_state_cache()
     return {"status": "deleted", "snapshotId": snapshot_id}
 
 
 # ============= Bookmarks Endpoints =============
 
+# 书签只在 POST/DELETE 时变化，GET 返回预序列化字节，
+# 命中时既不访问数据库也不重新编码 JSON；写路径置 None 失效
+_bookmarks_cache: Optional[bytes] = None
+
+
 @app.get("/api/bookmarks")
 async def get_bookmarks():
     """Get all bookmarks."""
-    bookmarks = get_all_bookmarks()
-    return bookmarks
+    global _bookmarks_cache
+    if _bookmarks_cache is None:
+        bookmarks = await asyncio.to_thread(get_all_bookmarks)
+        _bookmarks_cache = orjson.dumps(bookmarks)
+    return Response(_bookmarks_cache, media_type="application/json")
 
 
 @app.post("/api/bookmarks")
 async def create_bookmark(request: BookmarkRequest):
     """Create a bookmark."""
-    bookmark_id = save_bookmark(request.tick, request.note)
-
-    # Also create a timeline event
+    global _bookmarks_cache
+    # 书签与其时间线事件在一个事务中落库，而不是两次独立提交。
+    bookmark_id = _mkid()
     event = TimelineEvent(
-        id=str(uuid.uuid4()),
+        id=f"{bookmark_id}-event",
         tick=request.tick,
         type=EventType.BOOKMARK,
         title=f"Bookmark: {request.note}" if request.note else "Bookmark",
     )
-    save_timeline_event(event)
+    await asyncio.to_thread(save_bookmark_with_event, bookmark_id, request.tick, request.note, event)
+    _bookmarks_cache = None
 
     return {
         "id": bookmark_id,
@@ -1661,7 +2245,9 @@ async def create_bookmark(request: BookmarkRequest):
 @app.delete("/api/bookmarks/{bookmark_id}")
 async def remove_bookmark(bookmark_id: str):
     """Delete a bookmark."""
-    delete_bookmark(bookmark_id)
+    global _bookmarks_cache
+    await asyncio.to_thread(delete_bookmark, bookmark_id)
+    _bookmarks_cache = None
     return {"status": "deleted", "id": bookmark_id}
 
 
@@ -1669,63 +2255,70 @@ async def remove_bookmark(bookmark_id: str):
 
 @app.get("/api/interventions")
 async def list_interventions(
+    response: Response,
     limit: int = Query(100, description="Maximum number of intervention records to return"),
     offset: int = Query(0, description="Number of intervention records to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from X-Next-Cursor"),
 ):
-    """Get intervention history records."""
-    records = get_all_interventions()
-    if offset > 0:
-        records = records[offset:]
-    if limit >= 0:
-        records = records[:limit]
+    """Get intervention history records.（分页在 SQL 完成，不再整表加载）"""
+    records, next_cursor = await asyncio.to_thread(get_interventions, limit, offset, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [record.to_dict() for record in records]
 
 
 @app.post("/api/intervention")
 async def create_intervention(request: InterventionRequest):
     """Create an intervention record and apply command effects to simulation state."""
-    global _sim_state
-    _sim_state = get_simulation_state()
-
+    # 内存中的 _sim_state 才是权威数据；从数据库重载会把代理状态
+    # 回滚到最近一次合并落盘（最多落后 _SAVE_EVERY_TICKS 个 tick）
     execution = _execute_intervention(_sim_state, request.command, request.targetAgentId)
 
+    # 同一次干预的轨迹、持久化记录与时间线事件共享一次 ID 生成。
+    intervention_id = _mkid()
+
     # Keep a lightweight in-memory trail for quick state snapshots.
     _sim_state.interventions.append({
-        "id": str(uuid.uuid4()),
+        "id": intervention_id,
         "tick": request.tick,
         "command": request.command,
         "targetAgentId": request.targetAgentId,
     })
     _sim_state.interventions = _sim_state.interventions[-500:]
 
-    save_simulation_state(_sim_state)
+    # 干预即时持久化（不走去抖窗口），进程此刻崩溃也不丢这次变更
+    await asyncio.to_thread(_persist_sim_state, _sim_state)
 
     # Emit updates affected by this intervention.
     await ws_manager.emit_tick_update(_sim_state.tick, _sim_state.is_running, _sim_state.speed)
-    for agent_id in execution["affectedAgentIds"]:
-        agent_state = _get_agent_state_ref(_sim_state, agent_id)
-        if agent_state:
-            await ws_manager.emit_agent_update(agent_id, agent_state)
+    # 受影响代理合并为一帧批量更新，而不是逐代理逐客户端发送
+    agent_updates = {
+        agent_id: agent_state
+        for agent_id in execution["affectedAgentIds"]
+        if (agent_state := _get_agent_state_ref(_sim_state, agent_id))
+    }
+    await ws_manager.emit_agents_update(agent_updates)
 
     intervention = InterventionRecord(
-        id=str(uuid.uuid4()),
+        id=intervention_id,
         tick=request.tick,
         command=request.command,
         target_agent_id=request.targetAgentId,
     )
 
-    save_intervention(intervention)
-
     # Create timeline event
     event = TimelineEvent(
-        id=str(uuid.uuid4()),
+        id=f"{intervention_id}-event",
         tick=request.tick,
         type=EventType.INTERVENTION,
         title=f"Intervention: {request.command}",
         agent_id=request.targetAgentId,
         payload={"command": request.command, "execution": execution},
     )
-    save_timeline_event(event)
+    # 干预记录与其时间线事件在单个事务中落库（与书签的处理方式一致）
+    await asyncio.to_thread(save_intervention_with_event, intervention, event)
+    # 再推进一次版本，覆盖状态持久化之后写入的干预记录与时间线事件
+    _invalidate_state_cache()
 
     await ws_manager.emit_event_created(event.to_dict())
 
@@ -1740,6 +2333,14 @@ async def create_intervention(request: InterventionRequest):
 
 # ============= Visualization Endpoints =============
 
+# 布局端点 TTL 缓存：compute_agent_layout 内部已有按 (算法, 节点集) 的结果缓存，
+# 这里再按算法缓存整个响应体，命中时连 get_all_agents 的 DB 读也一并省掉。
+# 算法名先经 _LAYOUT_ALGORITHMS 白名单校验，缓存键不会随任意查询串增长
+_LAYOUT_ALGORITHMS = {"force_directed", "igraph_fr", "networkx_spring", "circular", "grid"}
+_LAYOUT_CACHE_TTL = 5.0
+_layout_response_cache: dict[str, tuple[float, dict]] = {}
+
+
 @app.get("/api/visualization/layout")
 async def get_agent_layout(
     algorithm: str = Query("force_directed", description="Layout algorithm"),
@@ -1750,15 +2351,28 @@ async def get_agent_layout(
     Query parameters:
     - algorithm: Layout algorithm (force_directed, circular, grid)
     """
-    from models import get_all_agents
-    agents = get_all_agents()
+    if algorithm not in _LAYOUT_ALGORITHMS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown layout algorithm: {algorithm}. Supported: {sorted(_LAYOUT_ALGORITHMS)}",
+        )
+
+    now = time.monotonic()
+    cached = _layout_response_cache.get(algorithm)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+
+    agents = await asyncio.to_thread(get_all_agents)
 
     agent_ids = [agent.id for agent in agents]
 
     # TODO: Get actual follow relationships from database
     follow_edges = []
 
-    positions = compute_agent_layout(
+    # 力导向布局是 O(N²×迭代) 的迭代计算，放到工作线程执行，
+    # 冷缓存时事件循环仍能继续处理其他请求
+    positions = await asyncio.to_thread(
+        compute_agent_layout,
         agent_ids=agent_ids,
         follow_edges=follow_edges,
         width=1000.0,
@@ -1766,10 +2380,12 @@ async def get_agent_layout(
         algorithm=algorithm,
     )
 
-    return {
+    payload = {
         "positions": positions,
         "algorithm": algorithm,
     }
+    _layout_response_cache[algorithm] = (now + _LAYOUT_CACHE_TTL, payload)
+    return payload
 
 
 @app.get("/api/visualization/network")
@@ -1837,6 +2453,20 @@ async def get_agent_network(
 
 # ============= WebSocket Endpoint =============
 
+# pong 时间戳按 ~50ms 窗口缓存：高频 ping 下同一窗口内的客户端共享
+# 一次 localtime 转换与字符串格式化，而不是每个 ping 各付一次
+_NOW_ISO_TTL = 0.05
+_now_iso_cache = {"value": "", "expires": 0.0}
+
+
+def _now_iso() -> str:
+    now = time.monotonic()
+    if now >= _now_iso_cache["expires"]:
+        _now_iso_cache["value"] = datetime.now().isoformat()
+        _now_iso_cache["expires"] = now + _NOW_ISO_TTL
+    return _now_iso_cache["value"]
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
@@ -1845,6 +2475,7 @@ async def websocket_endpoint(websocket: WebSocket):
     Subscribe to events by sending messages like:
     {"type": "subscribe", "eventTypes": ["tick", "post"], "agentIds": [1, 2, 3]}
     {"type": "unsubscribe", "eventTypes": ["tick"]}
+    {"type": "set_format", "format": "msgpack"}  # opt into binary frames
 
     Broadcast messages:
     {"type": "tick_update", "tick": 123, "isRunning": true, "speed": 1.0}
@@ -1871,16 +2502,23 @@ async def websocket_endpoint(websocket: WebSocket):
                 agent_ids = data.get("agentIds")
                 ws_manager.unsubscribe(client_id, event_types, agent_ids)
 
+            elif message_type == "set_format":
+                applied = ws_manager.set_format(client_id, str(data.get("format", "json")))
+                await ws_manager.send_personal_message({
+                    "type": "format_set",
+                    "format": applied,
+                }, client_id)
+
             elif message_type == "ping":
                 await ws_manager.send_personal_message({
                     "type": "pong",
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": _now_iso(),
                 }, client_id)
 
     except WebSocketDisconnect:
         ws_manager.disconnect(client_id)
-    except Exception as e:
-        print(f"WebSocket error: {e}")
+    except Exception:
+        logger.exception("WebSocket error for client %s", client_id)
         ws_manager.disconnect(client_id)
 
 
@@ -1889,7 +2527,7 @@ async def websocket_endpoint(websocket: WebSocket):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail},
     )
@@ -1898,11 +2536,15 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions."""
+    # 仅在 debug 下带回溯（格式化回溯本身不便宜），否则只记一行
     if settings.debug:
-        import traceback
-        print(traceback.format_exc())
+        logger.error("Unhandled exception on %s %s",
+                     request.method, request.url.path, exc_info=exc)
+    else:
+        logger.error("Unhandled exception on %s %s: %s",
+                     request.method, request.url.path, exc)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"error": "Internal server error"},
     )
@@ -1950,14 +2592,61 @@ if __name__ == "__main__":
         },
     }
 
+    # 事件循环/HTTP 解析器：uvloop + httptools（uvicorn[standard] 自带，
+    # Windows 等不支持的平台自动回退到纯 Python 实现）。
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "h11"
+
+    # 多 worker 由 WEB_CONCURRENCY 控制（标准进程管理器约定）。
+    # 注意：仿真状态与 ticker 目前在进程内，多 worker 会各自运行一份
+    # 仿真；在状态外置（Redis/DB 单写者）之前强制钳制为 1。
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1") or "1")
+    if workers > 1:
+        print(
+            f"WEB_CONCURRENCY={workers} requested, but the in-process "
+            "simulation state only supports a single worker; clamping to 1"
+        )
+        workers = 1
+
     print(f"Starting {settings.app_name} v{settings.version}")
     print(f"Logging to: {_log_file_path}")
+    print(f"Event loop: {loop_impl}, HTTP parser: {http_impl}, workers: {workers}")
+
+    # HTTP/2 可选：SOCSIM_HTTP2=1 且安装了 hypercorn 时改用 Hypercorn 服务，
+    # 仪表盘的 WS + 多个 REST 轮询得以复用同一条 TCP 连接（h2c 明文；
+    # 生产部署用 --certfile/--keyfile 或前置 nginx 终结 TLS）。
+    if os.environ.get("SOCSIM_HTTP2", "").lower() in ("1", "true", "yes"):
+        try:
+            import hypercorn.asyncio
+            from hypercorn.config import Config as HypercornConfig
+        except ImportError:
+            print("SOCSIM_HTTP2 requested but hypercorn is not installed; "
+                  "falling back to uvicorn (pip install hypercorn)")
+        else:
+            h2_config = HypercornConfig()
+            h2_config.bind = ["127.0.0.1:8000"]
+            h2_config.accesslog = str(_log_file_path)
+            h2_config.errorlog = str(_log_file_path)
+            print("Serving with Hypercorn (HTTP/2 enabled)")
+            asyncio.run(hypercorn.asyncio.serve(app, h2_config))
+            raise SystemExit(0)
 
     uvicorn.run(
         "main:app",
         host="127.0.0.1",
         port=8000,
         reload=False,
+        workers=workers,
+        loop=loop_impl,
+        http=http_impl,
         log_level="info",
         log_config=log_config,
         access_log=True,
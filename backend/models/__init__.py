@@ -43,26 +43,39 @@ from .database import (
     get_db_cursor,
     init_db,
     get_all_agents,
+    iter_all_agents,
     get_agent_by_id,
     get_agents_by_ids,
     save_agent_profile,
+    save_agent_profiles,
     get_feed_posts,
     save_feed_post,
+    save_feed_posts,
     get_feed_post_by_id,
     save_oasis_feed_post,
+    save_oasis_feed_posts,
     get_simulation_state,
     save_simulation_state,
+    update_simulation_control,
     create_snapshot,
     get_all_snapshots,
     get_snapshot_by_id,
+    get_snapshot_raw,
+    snapshot_exists,
     delete_snapshot,
+    prune_snapshots,
     save_timeline_event,
+    save_timeline_events,
     get_timeline_events,
     save_log_line,
+    save_log_lines,
     get_log_lines,
     save_intervention,
+    save_intervention_with_event,
     get_all_interventions,
+    get_interventions,
     save_bookmark,
+    save_bookmark_with_event,
     get_all_bookmarks,
     delete_bookmark,
     get_all_group_profiles,
@@ -109,26 +122,39 @@ __all__ = [
     "get_db_cursor",
     "init_db",
     "get_all_agents",
+    "iter_all_agents",
     "get_agent_by_id",
     "get_agents_by_ids",
     "save_agent_profile",
+    "save_agent_profiles",
     "get_feed_posts",
     "save_feed_post",
+    "save_feed_posts",
     "get_feed_post_by_id",
     "save_oasis_feed_post",
+    "save_oasis_feed_posts",
     "get_simulation_state",
     "save_simulation_state",
+    "update_simulation_control",
     "create_snapshot",
     "get_all_snapshots",
     "get_snapshot_by_id",
+    "get_snapshot_raw",
+    "snapshot_exists",
     "delete_snapshot",
+    "prune_snapshots",
     "save_timeline_event",
+    "save_timeline_events",
     "get_timeline_events",
     "save_log_line",
+    "save_log_lines",
     "get_log_lines",
     "save_intervention",
+    "save_intervention_with_event",
     "get_all_interventions",
+    "get_interventions",
     "save_bookmark",
+    "save_bookmark_with_event",
     "get_all_bookmarks",
     "delete_bookmark",
     "get_all_group_profiles",
@@ -7,9 +7,25 @@ import os
 import os.path as osp
 import sqlite3
 import json
+import time
+import datetime
+import orjson
+import threading
+import atexit
+import functools
+import hashlib
+import base64
 import uuid
 import shutil
-from typing import Any, Optional
+import zlib
+
+try:
+    import zstandard
+    _HAS_ZSTD = True
+except ImportError:
+    zstandard = None
+    _HAS_ZSTD = False
+from typing import Any, Iterator, Optional
 from contextlib import contextmanager
 
 from .types import (
@@ -53,14 +69,27 @@ SCHEMA_DIR = osp.join(BASE_DIR, "schema")
 
 
 def get_db_path() -> str:
-    """获取数据库文件路径。"""
+    """获取数据库文件路径。
+
+    每次 get_db_connection 都会走到这里；目录创建与遗留库迁移只需
+    做一次，解析结果按 (环境变量值, 相关 cwd) 缓存，热路径退化为
+    一次 environ 读 + 一次字典命中。环境变量改变（测试切库）会
+    产生新键，自然触发重新解析。
+    """
     env_db_path = os.environ.get("OASIS_DB_PATH")
+    # 相对路径形如 ./x 依赖 cwd，纳入缓存键；其余情况 cwd 无关
+    cwd = os.getcwd() if env_db_path and env_db_path.startswith(".") else ""
+    return _resolve_db_path(env_db_path, cwd)
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_db_path(env_db_path: Optional[str], cwd: str) -> str:
     if env_db_path:
         if osp.isabs(env_db_path):
             resolved = env_db_path
         # Respect explicit relative paths like ../data when running from backend.
         elif env_db_path.startswith("."):
-            resolved = osp.normpath(osp.join(os.getcwd(), env_db_path))
+            resolved = osp.normpath(osp.join(cwd, env_db_path))
         else:
             resolved = osp.normpath(osp.join(PROJECT_ROOT, env_db_path))
         db_dir = osp.dirname(resolved)
@@ -95,22 +124,68 @@ def _configure_sqlite(conn: sqlite3.Connection) -> None:
         conn.execute("PRAGMA synchronous=NORMAL;")
         conn.execute("PRAGMA busy_timeout=5000;")
         conn.execute("PRAGMA foreign_keys=ON;")
+        # 写密集工作负载的调优：页缓存 64MiB、临时表进内存、
+        # 读路径用 256MiB mmap 代替 read() 拷贝
+        conn.execute("PRAGMA cache_size=-65536;")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        conn.execute("PRAGMA mmap_size=268435456;")
     except Exception:
         # Best-effort; do not block startup if PRAGMA fails.
         pass
 
 
-@contextmanager
-def get_db_connection():
-    """数据库连接的上下文管理器。"""
+# 每线程复用一条长连接：每次调用都 connect/close 会反复执行 pragma、
+# 重建页缓存并重新解析路径；线程内复用让页缓存保持热态。
+# check_same_thread=False 仅为允许 atexit 从主线程统一关闭——
+# 连接本身仍是线程私有的，不会被跨线程并发使用。
+_tls = threading.local()
+_all_connections: list[sqlite3.Connection] = []
+_all_connections_lock = threading.Lock()
+
+
+def _get_tls_connection() -> sqlite3.Connection:
+    """获取当前线程的共享连接（必要时创建）。"""
     db_path = get_db_path()
-    conn = sqlite3.connect(db_path, timeout=30)
+    conn = getattr(_tls, "conn", None)
+    if conn is not None and getattr(_tls, "path", None) == db_path:
+        return conn
+    if conn is not None:
+        # 数据库路径变化（如测试切换 OASIS_DB_PATH）：换新连接
+        try:
+            conn.close()
+        except Exception:
+            pass
+    # cached_statements=256：代理查询的 SQL 很长，加大语句缓存
+    # 让 SQLite 复用已解析的 VDBE 程序而不是每次重新 parse/plan
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False,
+                           cached_statements=256)
     conn.row_factory = sqlite3.Row  # 启用按名称访问列
     _configure_sqlite(conn)
-    try:
-        yield conn
-    finally:
-        conn.close()
+    _tls.conn = conn
+    _tls.path = db_path
+    with _all_connections_lock:
+        _all_connections.append(conn)
+    return conn
+
+
+def _close_all_connections() -> None:
+    """进程退出时关闭所有线程的连接。"""
+    with _all_connections_lock:
+        for conn in _all_connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _all_connections.clear()
+
+
+atexit.register(_close_all_connections)
+
+
+@contextmanager
+def get_db_connection():
+    """数据库连接的上下文管理器（复用线程本地长连接，不关闭）。"""
+    yield _get_tls_connection()
 
 
 @contextmanager
@@ -166,6 +241,35 @@ def init_db():
             VALUES (1, 0, 0, 1.0, ?)
         """, (json.dumps(SimulationConfig().to_dict()),))
 
+        # 信息流排序索引（与 init_db_standalone 保持一致）
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_post_num_likes
+            ON post(num_likes DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_post_emotion_abs
+            ON post_emotion(ABS(emotion) DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_post_tick_tick
+            ON post_tick(tick DESC)
+        """)
+        # 日志级别过滤 + 时间排序走同一个复合索引
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_log_level_tick
+            ON simulation_log(level, tick DESC)
+        """)
+        # 热点外键/排序列的覆盖索引：user_* 扩展表的 user_id 都是
+        # PRIMARY KEY 已自带索引；这里补上仍走全表扫描的几处——
+        # 议题立场按 user_id 批量取、post 按作者/时间取、时间线按 tick 倒序
+        for stmt in (
+            "CREATE INDEX IF NOT EXISTS idx_issue_stance_user ON user_issue_stance(user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_post_user ON post(user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_post_created_at ON post(created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_timeline_tick ON timeline_event(tick DESC)",
+        ):
+            cursor.execute(stmt)
+
         # 创建 OASIS 帖子同步跟踪表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS oasis_post_sync (
@@ -176,6 +280,13 @@ def init_db():
             )
         """)
 
+        # agents_json 列的一次性迁移：之前 save_simulation_state 每次
+        # 调用都 try ALTER TABLE，即使失败也要付出 DDL 解析和 schema
+        # cookie 失效（进而作废全部预编译语句）的代价
+        cursor.execute("PRAGMA table_info(simulation_state)")
+        if "agents_json" not in {r[1] for r in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE simulation_state ADD COLUMN agents_json TEXT")
+
 
 def _row_get(row: sqlite3.Row, key: str, default=None):
     """辅助函数：从 sqlite3.Row 获取值，支持默认值。"""
@@ -188,131 +299,216 @@ def _row_get(row: sqlite3.Row, key: str, default=None):
         return default
 
 
-def row_to_agent_profile(row: sqlite3.Row) -> AgentProfile:
-    """将数据库行转换为 AgentProfile。"""
-    # 从查询中获取身份字段
-    age_band = _row_get(row, "age_band", "unknown")
-    gender = _row_get(row, "gender", "unknown")
-    country = _row_get(row, "country", "")
-    region_city = _row_get(row, "region_city", "")
-    profession = _row_get(row, "profession", "")
-    domain_str = _row_get(row, "domain_of_expertise", "[]")
+# 代理查询的 SQL 提升到模块级常量：sqlite3 的语句缓存按字符串精确
+# 匹配，常量保证每次传入同一对象，既命中缓存又省去大字符串的重复哈希
+_SQL_AGENT_SELECT = """
+    SELECT
+        u.*,
+        ug.group_name, ug.x, ug.y,
+        bf.O as big_five_O, bf.C as big_five_C, bf.E as big_five_E, bf.A as big_five_A, bf.N as big_five_N,
+        mf.care as moral_care, mf.fairness as moral_fairness, mf.loyalty as moral_loyalty,
+            mf.authority as moral_authority, mf.sanctity as moral_sanctity,
+        ss.influence_tier, ss.economic_band, ss.network_size_proxy,
+        bp.posts_per_day, bp.diurnal_pattern, bp.civility, bp.evidence_citation,
+        cs.sentiment, cs.arousal, cs.mood, cs.stance, cs.resources,
+        ui.age_band, ui.gender, ui.country, ui.region_city, ui.profession, ui.domain_of_expertise
+    FROM user u
+    LEFT JOIN user_group ug ON u.user_id = ug.user_id
+    LEFT JOIN user_big_five bf ON u.user_id = bf.user_id
+    LEFT JOIN user_moral_foundations mf ON u.user_id = mf.user_id
+    LEFT JOIN user_social_status ss ON u.user_id = ss.user_id
+    LEFT JOIN user_behavior_profile bp ON u.user_id = bp.user_id
+    LEFT JOIN user_cognitive_state cs ON u.user_id = cs.user_id
+    LEFT JOIN user_identity ui ON u.user_id = ui.user_id
+"""
+
+_SQL_GET_ALL_AGENTS = _SQL_AGENT_SELECT
+
+_SQL_GET_AGENT_BY_ID = _SQL_AGENT_SELECT + "    WHERE u.user_id = ?\n"
+
+# IN (...) 模板按 2 的幂长度分桶缓存：不同数量的 ID 复用同一条
+# 已解析语句，多余的占位符用 None 填充（IN 中的 NULL 永不匹配）
+_sql_agents_by_ids_cache: dict[int, str] = {}
+
 
+def _sql_agents_by_ids(bucket: int) -> str:
+    sql = _sql_agents_by_ids_cache.get(bucket)
+    if sql is None:
+        placeholders = ",".join("?" * bucket)
+        sql = _SQL_AGENT_SELECT + f"    WHERE u.user_id IN ({placeholders})\n"
+        _sql_agents_by_ids_cache[bucket] = sql
+    return sql
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_diurnal(pattern_json: str) -> tuple[DiurnalPattern, ...]:
+    """解析 diurnal_pattern 的 JSON 字符串（按原文缓存）。
+
+    不同模式组合只有少数几种，按 JSON 原文做 lru_cache 后
+    命中率接近 100%，省掉每行的解析和枚举构造。
+    """
+    return tuple(DiurnalPattern(p) for p in orjson.loads(pattern_json))
+
+
+def _fetch_issue_stances(cursor: sqlite3.Cursor,
+                         user_ids: Optional[list[int]] = None) -> dict[int, list[IssueStance]]:
+    """按 user_id 批量取议题立场，返回 {user_id: [IssueStance, ...]}。
+
+    user_ids 为 None 时取全表（get_all_agents 用）。
+    """
+    if user_ids is None:
+        cursor.execute("SELECT user_id, topic, support, certainty FROM user_issue_stance")
+    else:
+        if not user_ids:
+            return {}
+        placeholders = ",".join("?" * len(user_ids))
+        cursor.execute(f"""
+            SELECT user_id, topic, support, certainty FROM user_issue_stance
+            WHERE user_id IN ({placeholders})
+        """, user_ids)
+
+    stances: dict[int, list[IssueStance]] = {}
+    for user_id, topic, support, certainty in cursor.fetchall():
+        stances.setdefault(user_id, []).append(
+            IssueStance(topic=topic, support=support, certainty=certainty))
+    return stances
+
+
+# 枚举构造直查值→成员映射：跳过 Enum.__call__ 的分发与校验开销，
+# 未知值回退到正常构造以保留原有的 ValueError 行为
+_AGE_BAND_MAP = AgeBand._value2member_map_
+_GENDER_MAP = Gender._value2member_map_
+_INFLUENCE_TIER_MAP = InfluenceTier._value2member_map_
+_ECONOMIC_BAND_MAP = EconomicBand._value2member_map_
+_SENTIMENT_MAP = Sentiment._value2member_map_
+
+
+def _load_json_list(val) -> list:
+    """解码 JSON 列表列；空串/空数组短路，非字符串原样透传。"""
+    if isinstance(val, str):
+        return orjson.loads(val) if val and val != "[]" else []
+    return val if val is not None else []
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_agent_decoder(names: tuple[str, ...]):
+    """按查询列序运行时生成专用的行解码器（部分求值）。
+
+    通用解码每行要做几十次 {列名: 位置} 查找和 None 分支；这里在
+    首次见到某个列序时，把位置、默认值、枚举映射直接烘焙进一段
+    exec 编译的函数体，之后每行只执行定制好的位置取值与构造。
+    解码器按列名元组做 lru_cache，代理查询共用同一 SELECT 列序，
+    实际只编译一次。
+    """
+    cols = {n: i for i, n in enumerate(names)}
+
+    def ref(name: str, default) -> str:
+        i = cols.get(name)
+        if i is None:
+            return repr(default)
+        return f"(row[{i}] if row[{i}] is not None else {default!r})"
+
+    def raw(name: str) -> str:
+        i = cols.get(name)
+        return f"row[{i}]" if i is not None else "None"
+
+    source = f"""
+def _decode(row, issue_stances=None):
+    uid = {raw("user_id")}
     return AgentProfile(
-        id=row["user_id"],
-        name=row["name"] or row["user_name"] or f"Agent_{row['user_id']}",
-        group=_row_get(row, "group_name", "unassigned"),
+        id=uid,
+        name={raw("name")} or {raw("user_name")} or f"Agent_{{uid}}",
+        group={ref("group_name", "unassigned")},
         identity=Identity(
-            username=row["user_name"] or "",
-            age_band=AgeBand(age_band),
-            gender=Gender(gender),
-            country=country,
-            region_city=region_city,
-            profession=profession,
-            domain_of_expertise=json.loads(domain_str) if isinstance(domain_str, str) else domain_str,
+            username={raw("user_name")} or "",
+            age_band=_AGE_BAND_MAP.get((v0 := {ref("age_band", "unknown")})) or AgeBand(v0),
+            gender=_GENDER_MAP.get((v1 := {ref("gender", "unknown")})) or Gender(v1),
+            country={ref("country", "")},
+            region_city={ref("region_city", "")},
+            profession={ref("profession", "")},
+            domain_of_expertise=_load_json_list({raw("domain_of_expertise")}),
         ),
         psychometrics=Psychometrics(
             big_five=BigFive(
-                O=_row_get(row, "big_five_O", 0.5),
-                C=_row_get(row, "big_five_C", 0.5),
-                E=_row_get(row, "big_five_E", 0.5),
-                A=_row_get(row, "big_five_A", 0.5),
-                N=_row_get(row, "big_five_N", 0.5),
+                O={ref("big_five_O", 0.5)},
+                C={ref("big_five_C", 0.5)},
+                E={ref("big_five_E", 0.5)},
+                A={ref("big_five_A", 0.5)},
+                N={ref("big_five_N", 0.5)},
             ),
             moral_foundations=MoralFoundations(
-                care=_row_get(row, "moral_care", 0.5),
-                fairness=_row_get(row, "moral_fairness", 0.5),
-                loyalty=_row_get(row, "moral_loyalty", 0.5),
-                authority=_row_get(row, "moral_authority", 0.5),
-                sanctity=_row_get(row, "moral_sanctity", 0.5),
+                care={ref("moral_care", 0.5)},
+                fairness={ref("moral_fairness", 0.5)},
+                loyalty={ref("moral_loyalty", 0.5)},
+                authority={ref("moral_authority", 0.5)},
+                sanctity={ref("moral_sanctity", 0.5)},
             ),
         ),
         social_status=SocialStatus(
-            influence_tier=InfluenceTier(_row_get(row, "influence_tier", "ordinary_user")),
-            economic_band=EconomicBand(_row_get(row, "economic_band", "medium")),
-            network_size_proxy=_row_get(row, "network_size_proxy", 2),
+            influence_tier=_INFLUENCE_TIER_MAP.get((v2 := {ref("influence_tier", "ordinary_user")})) or InfluenceTier(v2),
+            economic_band=_ECONOMIC_BAND_MAP.get((v3 := {ref("economic_band", "medium")})) or EconomicBand(v3),
+            network_size_proxy={ref("network_size_proxy", 2)},
         ),
         behavior_profile=BehaviorProfile(
-            posts_per_day=_row_get(row, "posts_per_day", 1.0),
-            diurnal_pattern=[
-                DiurnalPattern(p) for p in json.loads(_row_get(row, "diurnal_pattern", '["unknown"]'))
-            ],
-            civility=_row_get(row, "civility", 0.5),
-            evidence_citation=_row_get(row, "evidence_citation", 0.5),
+            posts_per_day={ref("posts_per_day", 1.0)},
+            diurnal_pattern=list(_parse_diurnal({ref("diurnal_pattern", '["unknown"]')})),
+            civility={ref("civility", 0.5)},
+            evidence_citation={ref("evidence_citation", 0.5)},
         ),
         cognitive_state=CognitiveState(
             core_affect=CoreAffect(
-                sentiment=Sentiment(_row_get(row, "sentiment", "calm")),
-                arousal=_row_get(row, "arousal", 0.5),
+                sentiment=_SENTIMENT_MAP.get((v4 := {ref("sentiment", "calm")})) or Sentiment(v4),
+                arousal={ref("arousal", 0.5)},
             ),
-            issue_stances=[
-                IssueStance(topic=s["topic"], support=s["support"], certainty=s["certainty"])
-                for s in json.loads(_row_get(row, "issue_stances_json", "[]"))
-            ],
+            issue_stances=issue_stances if issue_stances is not None else [],
         ),
     )
+"""
+    namespace: dict = {}
+    exec(compile(source, "<agent-decoder>", "exec"), globals(), namespace)
+    return namespace["_decode"]
+
+
+def _agent_decoder_for(cursor: sqlite3.Cursor):
+    """从游标 description 取列名元组并返回对应的编译解码器。"""
+    return _compile_agent_decoder(tuple(d[0] for d in cursor.description))
+
+
+def iter_all_agents() -> Iterator[AgentProfile]:
+    """流式遍历所有代理。
+
+    fetchall 会一次性物化全部行再构造全部画像，峰值内存约为行
+    数据的数倍；这里按 arraysize=512 一批批 fetchmany 并即时产出
+    AgentProfile，分页调用方（如 /api/agents）用 islice 提前停止
+    时后续批次根本不会被取出。只读查询，游标随生成器结束释放。
+    """
+    with get_db_connection() as conn:
+        # 立场用独立游标先取齐，避免与流式游标的未取结果互相干扰
+        stances = _fetch_issue_stances(conn.cursor())
+        cursor = conn.cursor()
+        cursor.execute(_SQL_GET_ALL_AGENTS)
+        decode = _agent_decoder_for(cursor)
+        uid_idx = next(i for i, d in enumerate(cursor.description) if d[0] == "user_id")
+        cursor.arraysize = 512
+        while batch := cursor.fetchmany():
+            for row in batch:
+                yield decode(row, stances.get(row[uid_idx]))
 
 
 def get_all_agents() -> list[AgentProfile]:
     """从数据库获取所有代理。"""
-    with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                u.*,
-                ug.group_name, ug.x, ug.y,
-                bf.O as big_five_O, bf.C as big_five_C, bf.E as big_five_E, bf.A as big_five_A, bf.N as big_five_N,
-                mf.care as moral_care, mf.fairness as moral_fairness, mf.loyalty as moral_loyalty,
-                    mf.authority as moral_authority, mf.sanctity as moral_sanctity,
-                ss.influence_tier, ss.economic_band, ss.network_size_proxy,
-                bp.posts_per_day, bp.diurnal_pattern, bp.civility, bp.evidence_citation,
-                cs.sentiment, cs.arousal, cs.mood, cs.stance, cs.resources,
-                ui.age_band, ui.gender, ui.country, ui.region_city, ui.profession, ui.domain_of_expertise,
-                COALESCE('[' || group_concat('{"topic":"' || uis.topic || '","support":' || uis.support || ',"certainty":' || uis.certainty || '}') || ']', '[]') as issue_stances_json
-            FROM user u
-            LEFT JOIN user_group ug ON u.user_id = ug.user_id
-            LEFT JOIN user_big_five bf ON u.user_id = bf.user_id
-            LEFT JOIN user_moral_foundations mf ON u.user_id = mf.user_id
-            LEFT JOIN user_social_status ss ON u.user_id = ss.user_id
-            LEFT JOIN user_behavior_profile bp ON u.user_id = bp.user_id
-            LEFT JOIN user_cognitive_state cs ON u.user_id = cs.user_id
-            LEFT JOIN user_identity ui ON u.user_id = ui.user_id
-            LEFT JOIN user_issue_stance uis ON u.user_id = uis.user_id
-            GROUP BY u.user_id
-        """)
-        rows = cursor.fetchall()
-        return [row_to_agent_profile(row) for row in rows]
+    return list(iter_all_agents())
 
 
 def get_agent_by_id(agent_id: int) -> Optional[AgentProfile]:
     """通过 ID 获取单个代理。"""
     with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                u.*,
-                ug.group_name, ug.x, ug.y,
-                bf.O as big_five_O, bf.C as big_five_C, bf.E as big_five_E, bf.A as big_five_A, bf.N as big_five_N,
-                mf.care as moral_care, mf.fairness as moral_fairness, mf.loyalty as moral_loyalty,
-                    mf.authority as moral_authority, mf.sanctity as moral_sanctity,
-                ss.influence_tier, ss.economic_band, ss.network_size_proxy,
-                bp.posts_per_day, bp.diurnal_pattern, bp.civility, bp.evidence_citation,
-                cs.sentiment, cs.arousal, cs.mood, cs.stance, cs.resources,
-                ui.age_band, ui.gender, ui.country, ui.region_city, ui.profession, ui.domain_of_expertise,
-                COALESCE('[' || group_concat('{"topic":"' || uis.topic || '","support":' || uis.support || ',"certainty":' || uis.certainty || '}') || ']', '[]') as issue_stances_json
-            FROM user u
-            LEFT JOIN user_group ug ON u.user_id = ug.user_id
-            LEFT JOIN user_big_five bf ON u.user_id = bf.user_id
-            LEFT JOIN user_moral_foundations mf ON u.user_id = mf.user_id
-            LEFT JOIN user_social_status ss ON u.user_id = ss.user_id
-            LEFT JOIN user_behavior_profile bp ON u.user_id = bp.user_id
-            LEFT JOIN user_cognitive_state cs ON u.user_id = cs.user_id
-            LEFT JOIN user_identity ui ON u.user_id = ui.user_id
-            LEFT JOIN user_issue_stance uis ON u.user_id = uis.user_id
-            WHERE u.user_id = ?
-            GROUP BY u.user_id
-        """, (agent_id,))
+        cursor.execute(_SQL_GET_AGENT_BY_ID, (agent_id,))
         row = cursor.fetchone()
         if row:
-            return row_to_agent_profile(row)
+            decode = _agent_decoder_for(cursor)
+            stances = _fetch_issue_stances(cursor, [agent_id])
+            return decode(row, stances.get(agent_id))
         return None
 
 
@@ -321,136 +517,249 @@ def get_agents_by_ids(agent_ids: list[int]) -> list[AgentProfile]:
     if not agent_ids:
         return []
 
-    placeholders = ",".join("?" * len(agent_ids))
+    # 桶到 2 的幂以命中语句缓存；NULL 填充的占位符不匹配任何行
+    bucket = 1
+    while bucket < len(agent_ids):
+        bucket *= 2
+    params = list(agent_ids) + [None] * (bucket - len(agent_ids))
+
     with get_db_cursor() as cursor:
-        cursor.execute(f"""
-            SELECT
-                u.*,
-                ug.group_name, ug.x, ug.y,
-                bf.O as big_five_O, bf.C as big_five_C, bf.E as big_five_E, bf.A as big_five_A, bf.N as big_five_N,
-                mf.care as moral_care, mf.fairness as moral_fairness, mf.loyalty as moral_loyalty,
-                    mf.authority as moral_authority, mf.sanctity as moral_sanctity,
-                ss.influence_tier, ss.economic_band, ss.network_size_proxy,
-                bp.posts_per_day, bp.diurnal_pattern, bp.civility, bp.evidence_citation,
-                cs.sentiment, cs.arousal, cs.mood, cs.stance, cs.resources,
-                ui.age_band, ui.gender, ui.country, ui.region_city, ui.profession, ui.domain_of_expertise,
-                COALESCE('[' || group_concat('{"topic":"' || uis.topic || '","support":' || uis.support || ',"certainty":' || uis.certainty || '}') || ']', '[]') as issue_stances_json
-            FROM user u
-            LEFT JOIN user_group ug ON u.user_id = ug.user_id
-            LEFT JOIN user_big_five bf ON u.user_id = bf.user_id
-            LEFT JOIN user_moral_foundations mf ON u.user_id = mf.user_id
-            LEFT JOIN user_social_status ss ON u.user_id = ss.user_id
-            LEFT JOIN user_behavior_profile bp ON u.user_id = bp.user_id
-            LEFT JOIN user_cognitive_state cs ON u.user_id = cs.user_id
-            LEFT JOIN user_identity ui ON u.user_id = ui.user_id
-            LEFT JOIN user_issue_stance uis ON u.user_id = uis.user_id
-            WHERE u.user_id IN ({placeholders})
-            GROUP BY u.user_id
-        """, agent_ids)
+        cursor.execute(_sql_agents_by_ids(bucket), params)
+        decode = _agent_decoder_for(cursor)
+        uid_idx = next(i for i, d in enumerate(cursor.description) if d[0] == "user_id")
         rows = cursor.fetchall()
-        return [row_to_agent_profile(row) for row in rows]
+        stances = _fetch_issue_stances(cursor, agent_ids)
+        return [decode(row, stances.get(row[uid_idx])) for row in rows]
+
+
+# 画像写入的 upsert 语句：ON CONFLICT DO UPDATE 原地更新已有行，
+# 不像 INSERT OR REPLACE 那样 delete+insert 重写索引页；user 表
+# 只更新列出的列，保留 agent_id/created_at/关注计数等既有值
+_SQL_UPSERT_USER = """
+    INSERT INTO user (user_id, user_name, name, bio)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        user_name=excluded.user_name, name=excluded.name, bio=excluded.bio
+"""
+
+_SQL_UPSERT_BIG_FIVE = """
+    INSERT INTO user_big_five (user_id, O, C, E, A, N)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        O=excluded.O, C=excluded.C, E=excluded.E, A=excluded.A, N=excluded.N
+"""
+
+_SQL_UPSERT_MORAL = """
+    INSERT INTO user_moral_foundations (user_id, care, fairness, loyalty, authority, sanctity)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        care=excluded.care, fairness=excluded.fairness, loyalty=excluded.loyalty,
+        authority=excluded.authority, sanctity=excluded.sanctity
+"""
+
+_SQL_UPSERT_SOCIAL = """
+    INSERT INTO user_social_status (user_id, influence_tier, economic_band, network_size_proxy)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        influence_tier=excluded.influence_tier, economic_band=excluded.economic_band,
+        network_size_proxy=excluded.network_size_proxy
+"""
+
+_SQL_UPSERT_BEHAVIOR = """
+    INSERT INTO user_behavior_profile (user_id, posts_per_day, diurnal_pattern, civility, evidence_citation)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        posts_per_day=excluded.posts_per_day, diurnal_pattern=excluded.diurnal_pattern,
+        civility=excluded.civility, evidence_citation=excluded.evidence_citation
+"""
+
+# 冲突时只更新画像自带的 sentiment/arousal；mood/stance/resources 是
+# 运行期状态，重存画像不再把它们重置回默认值
+_SQL_UPSERT_COGNITIVE = """
+    INSERT INTO user_cognitive_state (user_id, sentiment, arousal, mood, stance, resources)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        sentiment=excluded.sentiment, arousal=excluded.arousal
+"""
+
+_SQL_UPSERT_IDENTITY = """
+    INSERT INTO user_identity (user_id, age_band, gender, country, region_city, profession, domain_of_expertise)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        age_band=excluded.age_band, gender=excluded.gender, country=excluded.country,
+        region_city=excluded.region_city, profession=excluded.profession,
+        domain_of_expertise=excluded.domain_of_expertise
+"""
+
+_SQL_UPSERT_GROUP = """
+    INSERT INTO user_group (user_id, group_name, x, y)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET group_name=excluded.group_name
+"""
+
+
+def _profile_rows(profile: AgentProfile) -> tuple:
+    """单个画像按表序展开成 8 组参数元组（与 _SQL_UPSERT_* 对应）。"""
+    return (
+        (profile.id, profile.identity.username, profile.name, ""),
+        (profile.id, profile.psychometrics.big_five.O,
+         profile.psychometrics.big_five.C, profile.psychometrics.big_five.E,
+         profile.psychometrics.big_five.A, profile.psychometrics.big_five.N),
+        (profile.id, profile.psychometrics.moral_foundations.care,
+         profile.psychometrics.moral_foundations.fairness, profile.psychometrics.moral_foundations.loyalty,
+         profile.psychometrics.moral_foundations.authority, profile.psychometrics.moral_foundations.sanctity),
+        (profile.id, profile.social_status.influence_tier.value,
+         profile.social_status.economic_band.value, profile.social_status.network_size_proxy),
+        (profile.id, profile.behavior_profile.posts_per_day,
+         orjson.dumps([p.value for p in profile.behavior_profile.diurnal_pattern]).decode(),
+         profile.behavior_profile.civility, profile.behavior_profile.evidence_citation),
+        (profile.id, profile.cognitive_state.core_affect.sentiment.value,
+         profile.cognitive_state.core_affect.arousal, 0.0, 0.0, 0.5),
+        (profile.id, profile.identity.age_band.value, profile.identity.gender.value,
+         profile.identity.country, profile.identity.region_city,
+         profile.identity.profession, orjson.dumps(profile.identity.domain_of_expertise).decode()),
+        (profile.id, profile.group, 0.0, 0.0),
+    )
+
+
+_UPSERT_STATEMENTS = (
+    _SQL_UPSERT_USER,
+    _SQL_UPSERT_BIG_FIVE,
+    _SQL_UPSERT_MORAL,
+    _SQL_UPSERT_SOCIAL,
+    _SQL_UPSERT_BEHAVIOR,
+    _SQL_UPSERT_COGNITIVE,
+    _SQL_UPSERT_IDENTITY,
+    _SQL_UPSERT_GROUP,
+)
 
 
 def save_agent_profile(profile: AgentProfile) -> None:
     """在数据库中保存或更新代理画像。"""
+    rows = _profile_rows(profile)
     with get_db_cursor() as cursor:
-        # 更新基础用户表
-        cursor.execute("""
-            INSERT OR REPLACE INTO user (user_id, user_name, name, bio)
-            VALUES (?, ?, ?, ?)
-        """, (profile.id, profile.identity.username, profile.name, ""))
+        for sql, params in zip(_UPSERT_STATEMENTS, rows):
+            cursor.execute(sql, params)
 
-        # 更新扩展表
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_big_five (user_id, O, C, E, A, N)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (profile.id, profile.psychometrics.big_five.O,
-              profile.psychometrics.big_five.C, profile.psychometrics.big_five.E,
-              profile.psychometrics.big_five.A, profile.psychometrics.big_five.N))
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_moral_foundations (user_id, care, fairness, loyalty, authority, sanctity)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (profile.id, profile.psychometrics.moral_foundations.care,
-              profile.psychometrics.moral_foundations.fairness, profile.psychometrics.moral_foundations.loyalty,
-              profile.psychometrics.moral_foundations.authority, profile.psychometrics.moral_foundations.sanctity))
+def save_agent_profiles(profiles: list[AgentProfile]) -> None:
+    """在单个事务中批量保存代理画像。
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_social_status (user_id, influence_tier, economic_band, network_size_proxy)
-            VALUES (?, ?, ?, ?)
-        """, (profile.id, profile.social_status.influence_tier.value,
-              profile.social_status.economic_band.value, profile.social_status.network_size_proxy))
+    批量导入（仿真启动时上千个画像）逐条保存会触发 N×8 次独立
+    提交；这里一趟展开参数，每张表一次 executemany，整体一次提交。
+    """
+    if not profiles:
+        return
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_behavior_profile (user_id, posts_per_day, diurnal_pattern, civility, evidence_citation)
-            VALUES (?, ?, ?, ?, ?)
-        """, (profile.id, profile.behavior_profile.posts_per_day,
-              json.dumps([p.value for p in profile.behavior_profile.diurnal_pattern]),
-              profile.behavior_profile.civility, profile.behavior_profile.evidence_citation))
+    batches: list[list[tuple]] = [[] for _ in _UPSERT_STATEMENTS]
+    for profile in profiles:
+        for batch, params in zip(batches, _profile_rows(profile)):
+            batch.append(params)
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_cognitive_state (user_id, sentiment, arousal, mood, stance, resources)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (profile.id, profile.cognitive_state.core_affect.sentiment.value,
-              profile.cognitive_state.core_affect.arousal, 0.0, 0.0, 0.5))
+    with get_db_cursor() as cursor:
+        for sql, batch in zip(_UPSERT_STATEMENTS, batches):
+            cursor.executemany(sql, batch)
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_identity (user_id, age_band, gender, country, region_city, profession, domain_of_expertise)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (profile.id, profile.identity.age_band.value, profile.identity.gender.value,
-              profile.identity.country, profile.identity.region_city,
-              profile.identity.profession, json.dumps(profile.identity.domain_of_expertise)))
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_group (user_id, group_name, x, y)
-            VALUES (?, ?, ?, ?)
-        """, (profile.id, profile.group, 0.0, 0.0))
+# sort 参数到 SQL ORDER BY 的映射；排序+截断在数据库内完成，
+# 避免在 Python 中超量取回再排序。
+# 排序键表达式：ORDER BY 与 keyset 游标的 WHERE 使用同一表达式，
+# emotion 形式与 idx_post_emotion_abs 的索引表达式（ABS(emotion)）保持一致
+_FEED_SORT_KEY = {
+    "time": "COALESCE(pt.tick, p.rowid)",
+    "emotion": "COALESCE(ABS(pe.emotion), 0)",
+    "likes": "p.num_likes",
+}
 
 
-def get_feed_posts(limit: int = 100, offset: int = 0) -> list[FeedPost]:
-    """从数据库获取信息流帖子。"""
-    with get_db_cursor() as cursor:
-        cursor.execute("""
+def encode_cursor(*parts) -> str:
+    """将游标分量编码为不透明的 urlsafe base64 字符串。"""
+    return base64.urlsafe_b64encode(orjson.dumps(list(parts))).decode()
+
+
+def decode_cursor(cursor: Optional[str], n_parts: int) -> Optional[list]:
+    """解码游标；格式错误或分量数不符时返回 None（按无游标处理）。"""
+    if not cursor:
+        return None
+    try:
+        parts = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        return None
+    if not isinstance(parts, list) or len(parts) != n_parts:
+        return None
+    return parts
+
+
+def _feed_row_to_post(row: sqlite3.Row) -> FeedPost:
+    """将 feed 查询行转换为 FeedPost（按查询列序一次性位置解包）。
+
+    tick 为 0 时回退到 created_at 的 epoch 值——该回退已在 SQL 里用
+    strftime('%s', ...) 完成（见 get_feed_posts），不再逐行跑 Python
+    的 strptime/mktime。
+    """
+    post_id, content, _created_at, num_likes, user_id, user_name, name, emotion, tick = row[:9]
+    return FeedPost(
+        id=str(post_id),
+        tick=tick,
+        author_id=user_id if user_id is not None else 0,
+        author_name=name or user_name or f"Agent_{user_id if user_id is not None else 0}",
+        emotion=emotion if emotion is not None else 0.0,
+        content=content or "",
+        likes=num_likes or 0,
+    )
+
+
+def get_feed_posts(
+    limit: int = 100,
+    offset: int = 0,
+    sort: str = "time",
+    cursor: Optional[str] = None,
+) -> tuple[list[FeedPost], Optional[str]]:
+    """从数据库获取信息流帖子。
+
+    返回 ``(posts, next_cursor)``。提供 ``cursor``（keyset 分页）时
+    忽略 ``offset``：WHERE 直接按 (排序键, post_id) 定位到上一页
+    末尾之后，避免大 OFFSET 的扫描-丢弃开销。
+    """
+    sort_key = _FEED_SORT_KEY.get(sort, _FEED_SORT_KEY["time"])
+    where = ""
+    params: list = []
+    decoded = decode_cursor(cursor, 2)
+    if decoded is not None:
+        where = f"WHERE ({sort_key} < ?) OR ({sort_key} = ? AND p.post_id < ?)"
+        params = [decoded[0], decoded[0], decoded[1]]
+        offset = 0
+
+    with get_db_cursor() as cursor_obj:
+        cursor_obj.execute(f"""
             SELECT
                 p.post_id, p.content, p.created_at, p.num_likes,
                 u.user_id, u.user_name, u.name,
                 pe.emotion,
-                COALESCE(pt.tick, 0) as tick
+                COALESCE(NULLIF(pt.tick, 0),
+                         CAST(strftime('%s', p.created_at) AS INTEGER), 0) as tick,
+                {sort_key} as sort_key
             FROM post p
             LEFT JOIN user u ON p.user_id = u.user_id
             LEFT JOIN post_emotion pe ON p.post_id = pe.post_id
             LEFT JOIN post_tick pt ON p.post_id = pt.post_id
-            ORDER BY COALESCE(pt.tick, p.rowid) DESC
+            {where}
+            ORDER BY {sort_key} DESC, p.post_id DESC
             LIMIT ? OFFSET ?
-        """, (limit, offset))
-        rows = cursor.fetchall()
-        posts = []
-        for row in rows:
-            tick = row["tick"]
-            # If tick is 0 (not set), use timestamp as approximation
-            if tick == 0:
-                import time
-                try:
-                    tick = int(time.mktime(time.strptime(row["created_at"], "%Y-%m-%d %H:%M:%S")))
-                except:
-                    tick = 0  # Fallback if timestamp parsing fails
-
-            posts.append(FeedPost(
-                id=str(row["post_id"]),
-                tick=tick,
-                author_id=row["user_id"] if row["user_id"] is not None else 0,
-                author_name=row["name"] or row["user_name"] or f"Agent_{row['user_id'] if row['user_id'] is not None else 0}",
-                emotion=_row_get(row, "emotion", 0.0),
-                content=row["content"] or "",
-                likes=row["num_likes"] or 0,
-            ))
-        return posts
+        """, (*params, limit, offset))
+        rows = cursor_obj.fetchall()
+
+    posts = [_feed_row_to_post(row) for row in rows]
+    next_cursor = None
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last["sort_key"], last["post_id"])
+    return posts, next_cursor
 
 
 def save_feed_post(post: FeedPost) -> str:
     """将信息流帖子保存到数据库并返回持久化的帖子 ID。"""
     with get_db_cursor() as cursor:
-        import datetime
         created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # 确保 user 存在（如果不存在则创建默认记录）
@@ -485,84 +794,88 @@ def save_feed_post(post: FeedPost) -> str:
         return str(post_id)
 
 
+def save_feed_posts(posts: list[FeedPost]) -> list[str]:
+    """在单个事务中批量保存信息流帖子，返回持久化的帖子 ID 列表。
+
+    与逐条 save_feed_post 相比，B 条帖子只有一次提交（一次 fsync），
+    作者兜底记录用一次 executemany 完成。
+    """
+    if not posts:
+        return []
+
+    created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    persisted_ids: list[str] = []
+
+    with get_db_cursor() as cursor:
+        cursor.executemany("""
+            INSERT OR IGNORE INTO user (user_id, user_name, name)
+            VALUES (?, ?, ?)
+        """, [
+            (post.author_id, f"Agent_{post.author_id}", f"Agent_{post.author_id}")
+            for post in posts
+        ])
+
+        for post in posts:
+            cursor.execute("""
+                INSERT INTO post (user_id, content, created_at, num_likes)
+                VALUES (?, ?, ?, ?)
+            """, (post.author_id, post.content, created_at, post.likes))
+            post_id = cursor.lastrowid
+
+            cursor.execute("""
+                INSERT INTO post_emotion (post_id, emotion)
+                VALUES (?, ?)
+            """, (post_id, post.emotion))
+            cursor.execute("""
+                INSERT OR REPLACE INTO post_tick (post_id, tick)
+                VALUES (?, ?)
+            """, (post_id, post.tick))
+            persisted_ids.append(str(post_id))
+
+    return persisted_ids
+
+
 def get_feed_post_by_id(post_id: str) -> Optional[FeedPost]:
-    """通过 ID 获取信息流帖子。"""
+    """通过 ID 获取信息流帖子。
+
+    单条 JOIN 查询取回帖子、作者与情绪/tick；OASIS 前缀 ID 通过
+    JOIN oasis_post_sync 解析，避免映射查询 + 帖子查询 + 作者查询
+    三次顺序往返。
+    """
+    select_clause = """
+        SELECT
+            p.post_id, p.user_id, p.content, p.created_at, p.num_likes,
+            pe.emotion, pt.tick, u.user_name, u.name
+        FROM post p
+        LEFT JOIN user u ON p.user_id = u.user_id
+        LEFT JOIN post_emotion pe ON p.post_id = pe.post_id
+        LEFT JOIN post_tick pt ON p.post_id = pt.post_id
+    """
+
     with get_db_cursor() as cursor:
-        # 检查是否为 OASIS 前缀的 ID（检查跟踪表）
+        # 检查是否为 OASIS 前缀的 ID（通过跟踪表解析）
         if post_id.startswith("oasis_"):
-            # 提取原始 OASIS 帖子 ID
             try:
                 oasis_id = int(post_id.replace("oasis_", ""))
-                # 检查此 OASIS 帖子是否已同步
-                cursor.execute("""
-                    SELECT feed_post_id FROM oasis_post_sync WHERE oasis_post_id = ?
-                """, (oasis_id,))
-                row = cursor.fetchone()
-                if not row:
-                    return None  # 尚未同步
-                # 获取实际的信息流帖子
-                feed_id = row[0]
-                cursor.execute("""
-                    SELECT
-                        p.post_id, p.user_id, p.content, p.created_at, p.num_likes,
-                        pe.emotion, pt.tick
-                    FROM post p
-                    LEFT JOIN post_emotion pe ON p.post_id = pe.post_id
-                    LEFT JOIN post_tick pt ON p.post_id = pt.post_id
-                    WHERE p.post_id = ?
-                """, (feed_id,))
-                post_row = cursor.fetchone()
-                if not post_row:
-                    return None
-                # 获取作者信息
-                cursor.execute("""
-                    SELECT user_name, name
-                    FROM user
-                    WHERE user_id = ?
-                """, (post_row[1],))
-                user_row = cursor.fetchone()
-                author_name = user_row[1] if user_row and user_row[1] else (user_row[0] if user_row else f"Agent_{post_row[1]}")
-                return FeedPost(
-                    id=post_id,
-                    tick=post_row[6] if post_row[6] is not None else 0,
-                    author_id=post_row[1],
-                    author_name=author_name,
-                    emotion=post_row[5] if post_row[5] is not None else 0.0,
-                    content=post_row[2],
-                    likes=post_row[4],
-                )
             except ValueError:
                 return None
-
-        # 将字符串 ID 转换为整数以用于常规帖子
-        try:
-            id_int = int(post_id)
-        except ValueError:
-            return None
-
-        cursor.execute("""
-            SELECT
-                p.post_id, p.user_id, p.content, p.created_at, p.num_likes,
-                pe.emotion, pt.tick
-            FROM post p
-            LEFT JOIN post_emotion pe ON p.post_id = pe.post_id
-            LEFT JOIN post_tick pt ON p.post_id = pt.post_id
-            WHERE p.post_id = ?
-        """, (id_int,))
+            cursor.execute(select_clause + """
+                JOIN oasis_post_sync ops ON ops.feed_post_id = p.post_id
+                WHERE ops.oasis_post_id = ?
+            """, (oasis_id,))
+        else:
+            # 将字符串 ID 转换为整数以用于常规帖子
+            try:
+                id_int = int(post_id)
+            except ValueError:
+                return None
+            cursor.execute(select_clause + "WHERE p.post_id = ?", (id_int,))
 
         row = cursor.fetchone()
         if not row:
             return None
 
-        # Get author info
-        cursor.execute("""
-            SELECT user_name, name
-            FROM user
-            WHERE user_id = ?
-        """, (row[1],))
-        user_row = cursor.fetchone()
-        author_name = user_row[1] if user_row and user_row[1] else (user_row[0] if user_row else f"Agent_{row[1]}")
-
+        author_name = row[8] or row[7] or f"Agent_{row[1]}"
         return FeedPost(
             id=post_id,
             tick=row[6] if row[6] is not None else 0,
@@ -587,15 +900,16 @@ def save_oasis_feed_post(oasis_post_id: int, post: FeedPost) -> bool:
                 return False  # 已同步
 
             # 将帖子保存到信息流数据库
-            import datetime
             created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+            # RETURNING 在同一次 VDBE 执行里取回新 id（SQLite >= 3.35）
             cursor.execute("""
                 INSERT INTO post (user_id, content, created_at, num_likes)
                 VALUES (?, ?, ?, ?)
+                RETURNING post_id
             """, (post.author_id, post.content, created_at, post.likes))
 
-            feed_post_id = cursor.lastrowid
+            feed_post_id = cursor.fetchone()[0]
 
             cursor.execute("""
                 INSERT INTO post_emotion (post_id, emotion)
@@ -619,6 +933,75 @@ def save_oasis_feed_post(oasis_post_id: int, post: FeedPost) -> bool:
             return False
 
 
+def save_oasis_feed_posts(items: list[tuple[int, FeedPost]]) -> set[int]:
+    """在单个事务中批量同步 OASIS 帖子，返回本次新同步的 OASIS 帖子 ID 集合。
+
+    与逐条 save_oasis_feed_post 相比：去重只做一次 IN 查询（而非每条
+    一次往返），依赖表（post_emotion/post_tick/oasis_post_sync）用
+    executemany 批量写入，N 条帖子只有一次提交。post 表仍逐行 INSERT，
+    因为需要每行的 lastrowid 作为映射的 feed_post_id。
+    """
+    if not items:
+        return set()
+
+    created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with get_db_cursor() as cursor:
+        # 一次往返预过滤已同步的 OASIS 帖子
+        oasis_ids = [oasis_id for oasis_id, _ in items]
+        placeholders = ",".join("?" * len(oasis_ids))
+        cursor.execute(f"""
+            SELECT oasis_post_id FROM oasis_post_sync
+            WHERE oasis_post_id IN ({placeholders})
+        """, oasis_ids)
+        already_synced = {row[0] for row in cursor.fetchall()}
+
+        # 作者兜底记录（同 save_feed_posts，外键开启时必需）
+        cursor.executemany("""
+            INSERT OR IGNORE INTO user (user_id, user_name, name)
+            VALUES (?, ?, ?)
+        """, [
+            (post.author_id, f"Agent_{post.author_id}", f"Agent_{post.author_id}")
+            for oasis_id, post in items
+            if oasis_id not in already_synced
+        ])
+
+        emotion_rows: list[tuple[int, float]] = []
+        tick_rows: list[tuple[int, int]] = []
+        mapping_rows: list[tuple[int, int]] = []
+        synced: set[int] = set()
+
+        for oasis_id, post in items:
+            if oasis_id in already_synced:
+                continue
+            cursor.execute("""
+                INSERT INTO post (user_id, content, created_at, num_likes)
+                VALUES (?, ?, ?, ?)
+                RETURNING post_id
+            """, (post.author_id, post.content, created_at, post.likes))
+            feed_post_id = cursor.fetchone()[0]
+            emotion_rows.append((feed_post_id, post.emotion))
+            tick_rows.append((feed_post_id, post.tick))
+            mapping_rows.append((oasis_id, feed_post_id))
+            synced.add(oasis_id)
+
+        if emotion_rows:
+            cursor.executemany("""
+                INSERT INTO post_emotion (post_id, emotion)
+                VALUES (?, ?)
+            """, emotion_rows)
+            cursor.executemany("""
+                INSERT OR REPLACE INTO post_tick (post_id, tick)
+                VALUES (?, ?)
+            """, tick_rows)
+            cursor.executemany("""
+                INSERT INTO oasis_post_sync (oasis_post_id, feed_post_id)
+                VALUES (?, ?)
+            """, mapping_rows)
+
+        return synced
+
+
 def get_simulation_state() -> SimulationState:
     """从数据库获取当前仿真状态。"""
     with get_db_cursor() as cursor:
@@ -626,13 +1009,13 @@ def get_simulation_state() -> SimulationState:
         row = cursor.fetchone()
 
         if row:
-            config = SimulationConfig.from_dict(json.loads(row["config"] or "{}"))
+            config = SimulationConfig.from_dict(orjson.loads(row["config"] or "{}"))
             # 如果可用，从 JSON 反序列化代理
             agents = {}
             agents_json = _row_get(row, "agents_json")
             if agents_json:
                 try:
-                    agents = json.loads(agents_json)
+                    agents = orjson.loads(agents_json)
                 except:
                     agents = {}
 
@@ -647,32 +1030,112 @@ def get_simulation_state() -> SimulationState:
         return SimulationState()
 
 
+# 上次写入的 agents_json 摘要（按库路径记，路径切换后不误跳过）：
+# agents 几个 tick 不变时只更新标量列，省掉每 tick 重写整个 JSON 块
+_last_agents_digest: Optional[tuple[str, str]] = None
+
+
 def save_simulation_state(state: SimulationState) -> None:
     """将仿真状态保存到数据库。"""
+    global _last_agents_digest
+
+    # agents 以 int 为键，需 OPT_NON_STR_KEYS 与 json.dumps 行为对齐
+    agents_json = orjson.dumps(state.agents, option=orjson.OPT_NON_STR_KEYS)
+    digest = (get_db_path(), hashlib.blake2b(agents_json, digest_size=16).hexdigest())
+    scalar_params = (state.tick, 1 if state.is_running else 0, state.speed,
+                     state.selected_agent_id, orjson.dumps(state.config.to_dict()).decode())
+
     with get_db_cursor() as cursor:
-        # 首先，尝试添加 agents_json 列（如果不存在）
-        try:
-            cursor.execute("ALTER TABLE simulation_state ADD COLUMN agents_json TEXT")
-        except:
-            pass  # 列已存在
+        if digest == _last_agents_digest:
+            cursor.execute("""
+                UPDATE simulation_state
+                SET current_tick = ?, is_running = ?, speed = ?, selected_agent_id = ?, config = ?
+                WHERE id = 1
+            """, scalar_params)
+        else:
+            cursor.execute("""
+                UPDATE simulation_state
+                SET current_tick = ?, is_running = ?, speed = ?, selected_agent_id = ?, config = ?, agents_json = ?
+                WHERE id = 1
+            """, (*scalar_params, agents_json.decode()))
+            _last_agents_digest = digest
+
+
+def update_simulation_control(
+    tick: int | None = None,
+    is_running: bool | None = None,
+    speed: float | None = None,
+    selected_agent_id: int | None = None,
+) -> None:
+    """只更新仿真状态行中变化的控制列（None 表示不变）。
+
+    控制端点只翻转一个布尔/浮点值；整行 get→改→save 会把全量
+    agents_json 重新序列化并回写，这里改为按列的定向 UPDATE。
+    """
+    sets: list[str] = []
+    params: list = []
+    if tick is not None:
+        sets.append("current_tick = ?")
+        params.append(tick)
+    if is_running is not None:
+        sets.append("is_running = ?")
+        params.append(1 if is_running else 0)
+    if speed is not None:
+        sets.append("speed = ?")
+        params.append(speed)
+    if selected_agent_id is not None:
+        sets.append("selected_agent_id = ?")
+        params.append(selected_agent_id)
+    if not sets:
+        return
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            f"UPDATE simulation_state SET {', '.join(sets)} WHERE id = 1",
+            params,
+        )
+
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _compress_snapshot_data(data: dict) -> bytes:
+    """快照 data 序列化并压缩成 BLOB（优先 zstd，缺包时退回 zlib）。
+
+    快照是整个 SimulationState 的 JSON，轻松到兆级；压缩后体积
+    缩小 5–10×，列表端点也不再为每行解码它（见 get_all_snapshots）。
+    """
+    raw = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    if _HAS_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    return zlib.compress(raw, 6)
 
-        cursor.execute("""
-            UPDATE simulation_state
-            SET current_tick = ?, is_running = ?, speed = ?, selected_agent_id = ?, config = ?, agents_json = ?
-            WHERE id = 1
-        """, (state.tick, 1 if state.is_running else 0, state.speed,
-              state.selected_agent_id, json.dumps(state.config.to_dict()),
-              json.dumps(state.agents)))
+
+def _decompress_snapshot_json(blob) -> bytes:
+    """把快照 data 列还原成 JSON 字节串：zstd/zlib BLOB 或历史遗留的 TEXT 行。"""
+    if isinstance(blob, str):
+        return blob.encode("utf-8")  # 压缩方案之前写入的 TEXT 行
+    if blob.startswith(_ZSTD_MAGIC):
+        if not _HAS_ZSTD:
+            raise RuntimeError("snapshot is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if blob.startswith(b"\x78"):
+        return zlib.decompress(blob)
+    return bytes(blob)
+
+
+def _decompress_snapshot_data(blob) -> dict:
+    """解码快照 data 列为字典。"""
+    return orjson.loads(_decompress_snapshot_json(blob))
 
 
 def create_snapshot(name: str, state: SimulationState) -> SimulationSnapshot:
     """Create a simulation snapshot."""
     snapshot_id = str(uuid.uuid4())
-    import time
     created_at = int(time.time())
 
     snapshot = SimulationSnapshot(
         id=snapshot_id,
+        name=name,
         experiment_name=state.config.experiment_name,
         created_at=created_at,
         run_number=1,
@@ -685,15 +1148,23 @@ def create_snapshot(name: str, state: SimulationState) -> SimulationSnapshot:
             INSERT INTO simulation_snapshot (id, name, experiment_name, created_at, run_number, final_tick, data)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (snapshot_id, name, snapshot.experiment_name, created_at,
-              snapshot.run_number, snapshot.final_tick, json.dumps(snapshot.data)))
+              snapshot.run_number, snapshot.final_tick,
+              _compress_snapshot_data(snapshot.data)))
 
     return snapshot
 
 
 def get_all_snapshots() -> list[SimulationSnapshot]:
-    """Get all simulation snapshots."""
+    """Get all simulation snapshots (仅元数据，data 为空字典)。
+
+    列表端点只展示元数据；完整 data 用 get_snapshot_by_id 按需
+    解压，列表不再为每行解码兆级 JSON。
+    """
     with get_db_cursor() as cursor:
-        cursor.execute("SELECT * FROM simulation_snapshot ORDER BY created_at DESC")
+        cursor.execute("""
+            SELECT id, name, experiment_name, created_at, run_number, final_tick
+            FROM simulation_snapshot ORDER BY created_at DESC
+        """)
         rows = cursor.fetchall()
 
         return [
@@ -704,7 +1175,7 @@ def get_all_snapshots() -> list[SimulationSnapshot]:
                 created_at=row["created_at"],
                 run_number=row["run_number"],
                 final_tick=row["final_tick"],
-                data=json.loads(row["data"]),
+                data={},
             )
             for row in rows
         ]
@@ -724,21 +1195,79 @@ def get_snapshot_by_id(snapshot_id: str) -> Optional[SimulationSnapshot]:
                 created_at=row["created_at"],
                 run_number=row["run_number"],
                 final_tick=row["final_tick"],
-                data=json.loads(row["data"]),
+                data=_decompress_snapshot_data(row["data"]),
             )
         return None
 
 
+def snapshot_exists(snapshot_id: str) -> bool:
+    """快照行是否存在（ETag 预检用，避免为 304 读取 data 大字段）。"""
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT 1 FROM simulation_snapshot WHERE id = ?", (snapshot_id,))
+        return cursor.fetchone() is not None
+
+
+def get_snapshot_raw(snapshot_id: str) -> Optional[dict]:
+    """获取快照元数据以及未解析的 data JSON 字节串。
+
+    供流式响应直接把存储的 JSON 转发给客户端，避免整个快照的
+    loads/dumps 往返；压缩行先解压回 JSON（不解析）。
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute("""
+            SELECT id, name, experiment_name, created_at, run_number, final_tick, data
+            FROM simulation_snapshot WHERE id = ?
+        """, (snapshot_id,))
+        row = cursor.fetchone()
+
+        if row:
+            return {
+                "id": row["id"],
+                "name": row["name"],
+                "experiment_name": row["experiment_name"],
+                "created_at": row["created_at"],
+                "run_number": row["run_number"],
+                "final_tick": row["final_tick"],
+                "data_json": (
+                    _decompress_snapshot_json(row["data"])
+                    if row["data"] is not None else b"null"
+                ),
+            }
+        return None
+
+
+# 模块级 SQL 常量：同一字符串对象让 sqlite3 的语句缓存
+# （按 SQL 文本键控）在各次调用间命中。
+_SQL_DELETE_SNAPSHOT = "DELETE FROM simulation_snapshot WHERE id = ?"
+
+
 def delete_snapshot(snapshot_id: str) -> bool:
     """Delete a snapshot by ID. Returns True if deleted."""
     with get_db_cursor() as cursor:
-        cursor.execute("DELETE FROM simulation_snapshot WHERE id = ?", (snapshot_id,))
+        cursor.execute(_SQL_DELETE_SNAPSHOT, (snapshot_id,))
         return cursor.rowcount > 0
 
 
+def prune_snapshots(keep: int = 50) -> int:
+    """只保留最近 ``keep`` 个快照，批量删除其余。返回删除行数。
+
+    快照无限累积会让 get_all_snapshots（/api/state 也会序列化它）
+    的响应随时间无界增长；单条 DELETE 子查询即可完成整批清理。
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute("""
+            DELETE FROM simulation_snapshot
+            WHERE id NOT IN (
+                SELECT id FROM simulation_snapshot
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            )
+        """, (keep,))
+        return cursor.rowcount
+
+
 def save_timeline_event(event: TimelineEvent) -> None:
     """Save a timeline event to the database."""
-    import time
     created_at = int(time.time())
 
     with get_db_cursor() as cursor:
@@ -746,35 +1275,73 @@ def save_timeline_event(event: TimelineEvent) -> None:
             INSERT INTO timeline_event (id, tick, event_type, agent_id, title, payload, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (event.id, event.tick, event.type.value, event.agent_id,
-              event.title, json.dumps(event.payload) if event.payload else None, created_at))
+              event.title, orjson.dumps(event.payload).decode() if event.payload else None, created_at))
 
 
-def get_timeline_events(limit: int = 100, offset: int = 0) -> list[TimelineEvent]:
-    """Get timeline events from the database."""
+def save_timeline_events(events: list[TimelineEvent]) -> None:
+    """在单个事务中批量保存时间线事件。"""
+    if not events:
+        return
+    created_at = int(time.time())
+
     with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT * FROM timeline_event
-            ORDER BY tick DESC, created_at DESC
+        cursor.executemany("""
+            INSERT INTO timeline_event (id, tick, event_type, agent_id, title, payload, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (event.id, event.tick, event.type.value, event.agent_id,
+             event.title, orjson.dumps(event.payload).decode() if event.payload else None, created_at)
+            for event in events
+        ])
+
+
+def get_timeline_events(
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> tuple[list[TimelineEvent], Optional[str]]:
+    """Get timeline events from the database.
+
+    返回 ``(events, next_cursor)``；提供 ``cursor`` 时按 (tick, rowid)
+    keyset 定位，忽略 ``offset``。rowid 作为同 tick 内的稳定次序键
+    （与 created_at 的插入顺序一致且保证唯一）。
+    """
+    where = ""
+    params: list = []
+    decoded = decode_cursor(cursor, 2)
+    if decoded is not None:
+        where = "WHERE (tick < ?) OR (tick = ? AND rowid < ?)"
+        params = [decoded[0], decoded[0], decoded[1]]
+        offset = 0
+
+    with get_db_cursor() as cursor_obj:
+        cursor_obj.execute(f"""
+            SELECT *, rowid AS row_order FROM timeline_event
+            {where}
+            ORDER BY tick DESC, rowid DESC
             LIMIT ? OFFSET ?
-        """, (limit, offset))
-        rows = cursor.fetchall()
-
-        return [
-            TimelineEvent(
-                id=row["id"],
-                tick=row["tick"],
-                type=EventType(row["event_type"]),
-                agent_id=row["agent_id"],
-                title=row["title"],
-                payload=json.loads(row["payload"]) if row["payload"] else None,
-            )
-            for row in rows
-        ]
+        """, (*params, limit, offset))
+        rows = cursor_obj.fetchall()
+
+    events = [
+        TimelineEvent(
+            id=row["id"],
+            tick=row["tick"],
+            type=EventType(row["event_type"]),
+            agent_id=row["agent_id"],
+            title=row["title"],
+            payload=orjson.loads(row["payload"]) if row["payload"] else None,
+        )
+        for row in rows
+    ]
+    next_cursor = None
+    if rows and len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1]["tick"], rows[-1]["row_order"])
+    return events, next_cursor
 
 
 def save_log_line(log: LogLine) -> None:
     """Save a log line to the database."""
-    import time
     created_at = int(time.time())
 
     with get_db_cursor() as cursor:
@@ -784,31 +1351,72 @@ def save_log_line(log: LogLine) -> None:
         """, (log.id, log.tick, log.agent_id, log.level.value, log.text, created_at))
 
 
-def get_log_lines(limit: int = 100) -> list[LogLine]:
-    """Get log lines from the database."""
-    with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT * FROM simulation_log
-            ORDER BY tick DESC, created_at DESC
-            LIMIT ?
-        """, (limit,))
-        rows = cursor.fetchall()
+def save_log_lines(logs: list[LogLine]) -> None:
+    """在单个事务中批量保存日志行。"""
+    if not logs:
+        return
+    created_at = int(time.time())
 
-        return [
-            LogLine(
-                id=row["id"],
-                tick=row["tick"],
-                agent_id=row["agent_id"],
-                level=LogLevel(row["level"]),
-                text=row["message"],
-            )
-            for row in rows
-        ]
+    with get_db_cursor() as cursor:
+        cursor.executemany("""
+            INSERT INTO simulation_log (id, tick, agent_id, level, message, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (log.id, log.tick, log.agent_id, log.level.value, log.text, created_at)
+            for log in logs
+        ])
+
+
+def get_log_lines(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    level: Optional[str] = None,
+    offset: int = 0,
+) -> tuple[list[LogLine], Optional[str]]:
+    """Get log lines from the database.
+
+    返回 ``(logs, next_cursor)``；游标语义与 ``get_timeline_events`` 相同。
+    级别过滤在 SQL WHERE 中完成（走 idx_log_level_tick 索引），
+    因此带过滤时仍能返回满 ``limit`` 行。
+    """
+    conditions: list[str] = []
+    params: list = []
+    if level:
+        conditions.append("level = ?")
+        params.append(level)
+    decoded = decode_cursor(cursor, 2)
+    if decoded is not None:
+        conditions.append("((tick < ?) OR (tick = ? AND rowid < ?))")
+        params.extend([decoded[0], decoded[0], decoded[1]])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with get_db_cursor() as cursor_obj:
+        cursor_obj.execute(f"""
+            SELECT *, rowid AS row_order FROM simulation_log
+            {where}
+            ORDER BY tick DESC, rowid DESC
+            LIMIT ? OFFSET ?
+        """, (*params, limit, offset))
+        rows = cursor_obj.fetchall()
+
+    logs = [
+        LogLine(
+            id=row["id"],
+            tick=row["tick"],
+            agent_id=row["agent_id"],
+            level=LogLevel(row["level"]),
+            text=row["message"],
+        )
+        for row in rows
+    ]
+    next_cursor = None
+    if rows and len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1]["tick"], rows[-1]["row_order"])
+    return logs, next_cursor
 
 
 def save_intervention(record: InterventionRecord) -> None:
     """Save an intervention record to the database."""
-    import time
     created_at = int(time.time())
 
     with get_db_cursor() as cursor:
@@ -818,27 +1426,72 @@ def save_intervention(record: InterventionRecord) -> None:
         """, (record.id, record.tick, record.command, record.target_agent_id, created_at))
 
 
-def get_all_interventions() -> list[InterventionRecord]:
-    """Get all intervention records."""
+def save_intervention_with_event(record: InterventionRecord, event: TimelineEvent) -> None:
+    """在单个事务中保存干预记录及其时间线事件。"""
+    created_at = int(time.time())
+
     with get_db_cursor() as cursor:
-        cursor.execute("SELECT * FROM intervention_record ORDER BY tick DESC")
-        rows = cursor.fetchall()
+        cursor.execute("""
+            INSERT INTO intervention_record (id, tick, command, target_agent_id, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (record.id, record.tick, record.command, record.target_agent_id, created_at))
+        cursor.execute("""
+            INSERT INTO timeline_event (id, tick, event_type, agent_id, title, payload, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (event.id, event.tick, event.type.value, event.agent_id,
+              event.title, orjson.dumps(event.payload).decode() if event.payload else None, created_at))
 
-        return [
-            InterventionRecord(
-                id=row["id"],
-                tick=row["tick"],
-                command=row["command"],
-                target_agent_id=row["target_agent_id"],
-            )
-            for row in rows
-        ]
+
+def get_all_interventions() -> list[InterventionRecord]:
+    """Get all intervention records."""
+    records, _ = get_interventions(limit=-1)
+    return records
+
+
+def get_interventions(
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> tuple[list[InterventionRecord], Optional[str]]:
+    """分页获取干预记录；``limit=-1`` 表示不限制。
+
+    游标语义与 ``get_timeline_events`` 相同（(tick, rowid) keyset）。
+    """
+    where = ""
+    params: list = []
+    decoded = decode_cursor(cursor, 2)
+    if decoded is not None:
+        where = "WHERE (tick < ?) OR (tick = ? AND rowid < ?)"
+        params = [decoded[0], decoded[0], decoded[1]]
+        offset = 0
+
+    with get_db_cursor() as cursor_obj:
+        cursor_obj.execute(f"""
+            SELECT *, rowid AS row_order FROM intervention_record
+            {where}
+            ORDER BY tick DESC, rowid DESC
+            LIMIT ? OFFSET ?
+        """, (*params, limit, offset))
+        rows = cursor_obj.fetchall()
+
+    records = [
+        InterventionRecord(
+            id=row["id"],
+            tick=row["tick"],
+            command=row["command"],
+            target_agent_id=row["target_agent_id"],
+        )
+        for row in rows
+    ]
+    next_cursor = None
+    if rows and limit >= 0 and len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1]["tick"], rows[-1]["row_order"])
+    return records, next_cursor
 
 
 def save_bookmark(tick: int, note: str) -> str:
     """Save a timeline bookmark."""
     bookmark_id = str(uuid.uuid4())
-    import time
     created_at = int(time.time())
 
     with get_db_cursor() as cursor:
@@ -850,6 +1503,24 @@ def save_bookmark(tick: int, note: str) -> str:
     return bookmark_id
 
 
+def save_bookmark_with_event(bookmark_id: str, tick: int, note: str, event: TimelineEvent) -> str:
+    """在单个事务中保存书签及其时间线事件。"""
+    created_at = int(time.time())
+
+    with get_db_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO timeline_bookmark (id, tick, note, created_at)
+            VALUES (?, ?, ?, ?)
+        """, (bookmark_id, tick, note, created_at))
+        cursor.execute("""
+            INSERT INTO timeline_event (id, tick, event_type, agent_id, title, payload, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (event.id, event.tick, event.type.value, event.agent_id,
+              event.title, orjson.dumps(event.payload).decode() if event.payload else None, created_at))
+
+    return bookmark_id
+
+
 def get_all_bookmarks() -> list[dict[str, Any]]:
     """Get all bookmarks."""
     with get_db_cursor() as cursor:
@@ -268,16 +268,22 @@ class AgentProfile:
     cognitive_state: CognitiveState = field(default_factory=CognitiveState)
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "group": self.group,
-            "identity": self.identity.to_dict(),
-            "psychometrics": self.psychometrics.to_dict(),
-            "social_status": self.social_status.to_dict(),
-            "behavior_profile": self.behavior_profile.to_dict(),
-            "cognitive_state": self.cognitive_state.to_dict(),
-        }
+        # profile 加载后不可变；嵌套 to_dict 级联只做一次，之后复用。
+        # 调用方（代理初始化、/api/agents）都把结果当只读数据使用。
+        cached = getattr(self, "_dict_cache", None)
+        if cached is None:
+            cached = {
+                "id": self.id,
+                "name": self.name,
+                "group": self.group,
+                "identity": self.identity.to_dict(),
+                "psychometrics": self.psychometrics.to_dict(),
+                "social_status": self.social_status.to_dict(),
+                "behavior_profile": self.behavior_profile.to_dict(),
+                "cognitive_state": self.cognitive_state.to_dict(),
+            }
+            self._dict_cache = cached
+        return cached
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "AgentProfile":
@@ -427,9 +433,14 @@ class AgentState:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FeedPost:
-    """Feed Post (信息流帖子)"""
+    """Feed Post (信息流帖子)
+
+    slots=True：信息流是基数最大的对象（每页上千个实例），槽存储
+    省掉每实例的 __dict__ 并加快属性访问；to_dict 的缓存因此改为
+    显式字段而不是动态属性。
+    """
     id: str
     tick: int
     author_id: int
@@ -437,17 +448,24 @@ class FeedPost:
     emotion: float  # -1..1
     content: str
     likes: int = 0
+    _dict_cache: dict[str, Any] | None = field(default=None, repr=False, compare=False)
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "id": self.id,
-            "tick": self.tick,
-            "authorId": self.author_id,
-            "authorName": self.author_name,
-            "emotion": self.emotion,
-            "content": self.content,
-            "likes": self.likes,
-        }
+        # 写入后不再变更（id 在落库回填后才首次序列化），字典只构建一次；
+        # get_state 每次轮询都会重放整个信息流，重复构建是纯浪费
+        cached = self._dict_cache
+        if cached is None:
+            cached = {
+                "id": self.id,
+                "tick": self.tick,
+                "authorId": self.author_id,
+                "authorName": self.author_name,
+                "emotion": self.emotion,
+                "content": self.content,
+                "likes": self.likes,
+            }
+            self._dict_cache = cached
+        return cached
 
 
 @dataclass
@@ -461,14 +479,19 @@ class TimelineEvent:
     payload: dict[str, Any] | None = None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "id": self.id,
-            "tick": self.tick,
-            "type": self.type.value,
-            "agentId": self.agent_id,
-            "title": self.title,
-            "payload": self.payload,
-        }
+        # 事件创建后不可变，与 FeedPost 同样按首次访问缓存
+        cached = getattr(self, "_dict_cache", None)
+        if cached is None:
+            cached = {
+                "id": self.id,
+                "tick": self.tick,
+                "type": self.type.value,
+                "agentId": self.agent_id,
+                "title": self.title,
+                "payload": self.payload,
+            }
+            self._dict_cache = cached
+        return cached
 
 
 @dataclass
@@ -481,13 +504,18 @@ class LogLine:
     agent_id: int | None = None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "id": self.id,
-            "tick": self.tick,
-            "agentId": self.agent_id,
-            "level": self.level.value,
-            "text": self.text,
-        }
+        # 日志行创建后不可变，与 FeedPost 同样按首次访问缓存
+        cached = getattr(self, "_dict_cache", None)
+        if cached is None:
+            cached = {
+                "id": self.id,
+                "tick": self.tick,
+                "agentId": self.agent_id,
+                "level": self.level.value,
+                "text": self.text,
+            }
+            self._dict_cache = cached
+        return cached
 
 
 @dataclass
@@ -502,15 +530,20 @@ class GroupProfile:
     norm_summary: str = ""
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "key": self.key,
-            "label": self.label,
-            "dominantStratum": self.dominant_stratum.value,
-            "cohesion": self.cohesion,
-            "polarization": self.polarization,
-            "trustClimate": self.trust_climate,
-            "normSummary": self.norm_summary,
-        }
+        # 与 AgentProfile 相同：加载后不可变，字典只构建一次
+        cached = getattr(self, "_dict_cache", None)
+        if cached is None:
+            cached = {
+                "key": self.key,
+                "label": self.label,
+                "dominantStratum": self.dominant_stratum.value,
+                "cohesion": self.cohesion,
+                "polarization": self.polarization,
+                "trustClimate": self.trust_climate,
+                "normSummary": self.norm_summary,
+            }
+            self._dict_cache = cached
+        return cached
 
 
 @dataclass
@@ -605,12 +638,17 @@ class InterventionRecord:
     target_agent_id: int | None = None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "id": self.id,
-            "tick": self.tick,
-            "command": self.command,
-            "targetAgentId": self.target_agent_id,
-        }
+        # 干预记录创建后不可变，与 FeedPost 同样按首次访问缓存
+        cached = getattr(self, "_dict_cache", None)
+        if cached is None:
+            cached = {
+                "id": self.id,
+                "tick": self.tick,
+                "command": self.command,
+                "targetAgentId": self.target_agent_id,
+            }
+            self._dict_cache = cached
+        return cached
 
 
 @dataclass
@@ -622,10 +660,12 @@ class SimulationSnapshot:
     run_number: int
     final_tick: int
     data: dict[str, Any]
+    name: str = ""
 
     def to_dict(self) -> dict[str, Any]:
         return {
             "id": self.id,
+            "name": self.name,
             "experimentName": self.experiment_name,
             "createdAt": self.created_at,
             "runNumber": self.run_number,
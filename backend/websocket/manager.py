@@ -1,7 +1,6 @@
 """
 用于实时更新的 WebSocket 连接管理器。
 """
-import json
 import uuid
 from typing import Dict, Set, Any, Optional, Callable
 from dataclasses import dataclass, field
@@ -9,8 +8,15 @@ from collections import defaultdict
 import asyncio
 from datetime import datetime
 
+import orjson
 from fastapi import WebSocket
 
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
 
 @dataclass
 class Subscription:
@@ -32,12 +38,21 @@ class WebSocketManager:
         # 订阅：client_id -> Subscription
         self.subscriptions: Dict[str, Subscription] = {}
 
+        # 每客户端线格式："json"（默认）或 "msgpack"（可选的二进制帧）
+        self.client_formats: Dict[str, str] = {}
+
         # 按事件类型的客户端订阅：event_type -> client_ids 集合
         self.event_subscribers: Dict[str, Set[str]] = defaultdict(set)
 
         # 代理订阅：agent_id -> client_ids 集合
         self.agent_subscribers: Dict[int, Set[str]] = defaultdict(set)
 
+        # 状态帧合并发送：每客户端只保留最新一帧与一个唤醒事件，
+        # 由独立发送任务推送，慢客户端不会阻塞其它客户端的状态更新
+        self._state_latest: Dict[str, tuple] = {}
+        self._state_events: Dict[str, asyncio.Event] = {}
+        self._state_tasks: Dict[str, asyncio.Task] = {}
+
         # 用于广播的消息队列
         self.message_queue: asyncio.Queue = asyncio.Queue()
 
@@ -65,6 +80,8 @@ class WebSocketManager:
 
         self.active_connections[client_id] = websocket
         self.subscriptions[client_id] = Subscription()
+        self._state_events[client_id] = asyncio.Event()
+        self._state_tasks[client_id] = asyncio.create_task(self._state_sender(client_id))
 
         # 发送欢迎消息
         await self.send_personal_message({
@@ -85,6 +102,13 @@ class WebSocketManager:
         if client_id in self.active_connections:
             del self.active_connections[client_id]
 
+        self.client_formats.pop(client_id, None)
+        self._state_latest.pop(client_id, None)
+        self._state_events.pop(client_id, None)
+        task = self._state_tasks.pop(client_id, None)
+        if task is not None:
+            task.cancel()
+
         if client_id in self.subscriptions:
             # 清理事件订阅
             subscription = self.subscriptions[client_id]
@@ -113,7 +137,10 @@ class WebSocketManager:
 
         try:
             websocket = self.active_connections[client_id]
-            await websocket.send_json(message)
+            if self.client_formats.get(client_id) == "msgpack":
+                await websocket.send_bytes(msgpack.packb(message))
+            else:
+                await websocket.send_text(orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode())
             return True
         except Exception as e:
             # 连接可能已关闭
@@ -134,9 +161,28 @@ class WebSocketManager:
         else:
             target_clients = self.active_connections.keys()
 
-        # 向所有目标客户端发送
+        # 每种线格式只序列化一次，然后以文本/字节帧扇出，
+        # 避免为每个客户端重复 dumps 同一负载。
+        text_frame: Optional[str] = None
+        packed_frame: Optional[bytes] = None
+
         for client_id in list(target_clients):  # 复制以避免在迭代期间修改
-            await self.send_personal_message(message, client_id)
+            websocket = self.active_connections.get(client_id)
+            if websocket is None:
+                continue
+            try:
+                if self.client_formats.get(client_id) == "msgpack":
+                    if packed_frame is None:
+                        packed_frame = msgpack.packb(message)
+                    await websocket.send_bytes(packed_frame)
+                else:
+                    if text_frame is None:
+                        # orjson 输出 bytes，JSON 客户端期待文本帧，解码后发送
+                        text_frame = orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+                    await websocket.send_text(text_frame)
+            except Exception:
+                # 连接可能已关闭
+                self.disconnect(client_id)
 
     async def broadcast_to_agent_subscribers(self, agent_id: int, message: dict) -> None:
         """
@@ -149,8 +195,25 @@ class WebSocketManager:
         if agent_id not in self.agent_subscribers:
             return
 
+        # 与 broadcast 相同：每种线格式只序列化一次再扇出
+        text_frame: Optional[str] = None
+        packed_frame: Optional[bytes] = None
+
         for client_id in list(self.agent_subscribers[agent_id]):
-            await self.send_personal_message(message, client_id)
+            websocket = self.active_connections.get(client_id)
+            if websocket is None:
+                continue
+            try:
+                if self.client_formats.get(client_id) == "msgpack":
+                    if packed_frame is None:
+                        packed_frame = msgpack.packb(message)
+                    await websocket.send_bytes(packed_frame)
+                else:
+                    if text_frame is None:
+                        text_frame = orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+                    await websocket.send_text(text_frame)
+            except Exception:
+                self.disconnect(client_id)
 
     def subscribe(self, client_id: str, event_types: Optional[list[str]] = None,
                   agent_ids: Optional[list[int]] = None) -> None:
@@ -202,6 +265,17 @@ class WebSocketManager:
                 subscription.agent_ids.discard(agent_id)
                 self.agent_subscribers[agent_id].discard(client_id)
 
+    def set_format(self, client_id: str, wire_format: str) -> str:
+        """设置客户端的线格式；msgpack 不可用时回退到 json。
+
+        返回实际生效的格式。
+        """
+        if wire_format == "msgpack" and HAS_MSGPACK:
+            self.client_formats[client_id] = "msgpack"
+        else:
+            self.client_formats[client_id] = "json"
+        return self.client_formats[client_id]
+
     def get_connection_count(self) -> int:
         """获取活动连接数。"""
         return len(self.active_connections)
@@ -245,6 +319,21 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat(),
         })
 
+    async def emit_agents_update(self, updates: dict[int, dict]) -> None:
+        """批量发送多个代理的状态更新（单帧）。
+
+        干预可能同时影响成百个代理；逐个 emit_agent_update 是
+        O(代理数 × 客户端数) 次序列化与发送，合并成一帧后
+        序列化一次、每个客户端只收一条消息。
+        """
+        if not updates:
+            return
+        await self.broadcast({
+            "type": "agents_update",
+            "updates": updates,
+            "timestamp": datetime.now().isoformat(),
+        })
+
     async def emit_post_created(self, post: dict) -> None:
         """发送帖子创建事件。"""
         await self.broadcast({
@@ -253,6 +342,16 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat(),
         }, event_type="post")
 
+    async def emit_posts_created_bulk(self, posts: list[dict]) -> None:
+        """以单帧发送一批帖子创建事件（前端解复用）。"""
+        if not posts:
+            return
+        await self.broadcast({
+            "type": "posts_created",
+            "posts": posts,
+            "timestamp": datetime.now().isoformat(),
+        }, event_type="post")
+
     async def emit_event_created(self, event: dict) -> None:
         """发送时间线事件创建。"""
         await self.broadcast({
@@ -261,6 +360,16 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat(),
         }, event_type="event")
 
+    async def emit_events_created_bulk(self, events: list[dict]) -> None:
+        """以单帧发送一批时间线事件创建。"""
+        if not events:
+            return
+        await self.broadcast({
+            "type": "events_created",
+            "events": events,
+            "timestamp": datetime.now().isoformat(),
+        }, event_type="event")
+
     async def emit_log_added(self, log: dict) -> None:
         """发送日志添加事件。"""
         await self.broadcast({
@@ -269,13 +378,77 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat(),
         }, event_type="log")
 
-    async def emit_simulation_state(self, state: dict) -> None:
-        """发送完整仿真状态更新。"""
+    async def emit_logs_added_bulk(self, logs: list[dict]) -> None:
+        """以单帧发送一批日志添加事件。"""
+        if not logs:
+            return
         await self.broadcast({
+            "type": "logs_added",
+            "logs": logs,
+            "timestamp": datetime.now().isoformat(),
+        }, event_type="log")
+
+    async def _state_sender(self, client_id: str) -> None:
+        """每客户端状态发送循环：发送最新帧，其余帧被覆盖合并。"""
+        event = self._state_events.get(client_id)
+        if event is None:
+            return
+        try:
+            while True:
+                await event.wait()
+                event.clear()
+                frame = self._state_latest.pop(client_id, None)
+                if frame is None:
+                    continue
+                websocket = self.active_connections.get(client_id)
+                if websocket is None:
+                    return
+                kind, payload = frame
+                try:
+                    if kind == "bytes":
+                        await websocket.send_bytes(payload)
+                    else:
+                        await websocket.send_text(payload)
+                except Exception:
+                    self.disconnect(client_id)
+                    return
+        except asyncio.CancelledError:
+            pass
+
+    async def emit_simulation_state(self, state: dict) -> None:
+        """发送完整仿真状态更新。
+
+        不直接 await 每个客户端：每种线格式序列化一次后，只覆盖
+        各客户端的"最新帧"并唤醒其发送任务。慢客户端不拖慢别人，
+        连续的状态更新（如快照连续加载）对每个客户端合并为一帧。
+        """
+        message = {
             "type": "simulation_state",
             "state": state,
             "timestamp": datetime.now().isoformat(),
-        }, event_type="state")
+        }
+
+        if "state" in self.event_subscribers:
+            target_clients = self.event_subscribers["state"]
+        else:
+            target_clients = self.active_connections.keys()
+
+        text_frame: Optional[str] = None
+        packed_frame: Optional[bytes] = None
+        for client_id in list(target_clients):
+            if client_id not in self.active_connections:
+                continue
+            if self.client_formats.get(client_id) == "msgpack":
+                if packed_frame is None:
+                    packed_frame = msgpack.packb(message)
+                self._state_latest[client_id] = ("bytes", packed_frame)
+            else:
+                if text_frame is None:
+                    text_frame = orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+                self._state_latest[client_id] = ("text", text_frame)
+            event = self._state_events.get(client_id)
+            if event is not None:
+                event.set()
 
     async def emit_error(self, error: str, details: Optional[dict] = None) -> None:
         """发送错误事件。"""
@@ -93,6 +93,14 @@ export function useRealEngine() {
         break
       }
 
+      case 'agents_update': {
+        // 批量代理更新（如干预影响多个代理时后端合并为一帧）
+        for (const [agentId, state] of Object.entries(message.updates)) {
+          sim.actions.patchAgent(Number(agentId), state)
+        }
+        break
+      }
+
       case 'post_created': {
         const { post } = message
         sim.actions.pushFeed(post.authorId, post.content, post.emotion)
@@ -314,6 +314,7 @@ export type WebSocketMessage =
   | { type: 'connected'; clientId: string; timestamp: string }
   | { type: 'tick_update'; tick: number; isRunning: boolean; speed: number; timestamp: string }
   | { type: 'agent_update'; agentId: number; state: AgentState; timestamp: string }
+  | { type: 'agents_update'; updates: Record<number, AgentState>; timestamp: string }
   | { type: 'post_created'; post: FeedPost; timestamp: string }
   | { type: 'event_created'; event: TimelineEvent; timestamp: string }
   | { type: 'log_added'; log: LogLine; timestamp: string }